@@ -0,0 +1,213 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+
+CHUNK_SIZE = 1 << 16
+DROP = object()  # rewrite_json_file / CorpusStore.rewrite에서 fn이 반환하면 레코드 삭제
+
+# ✅ 문서 하나를 모델 입력 문장으로 변환 (제목 + 본문)
+def record_text(doc):
+    return doc["title"] + " " + doc["content"]
+
+# ✅ 문서 작성일 ("2025.01.31" / "2025.01.31." 형식) → date, 없거나 형식이 다르면 None
+def record_date(doc):
+    try:
+        return datetime.strptime(str(doc.get("date", "")).strip().rstrip("."), "%Y.%m.%d").date()
+    except ValueError:
+        return None
+
+# ✅ 문서 식별 키 (질문 URL, 없으면 제목 + 본문 해시)
+def record_key(doc):
+    if doc.get("question_url"):
+        return doc["question_url"]
+    return "sha1:" + hashlib.sha1(record_text(doc).encode("utf-8")).hexdigest()
+
+# ✅ 데이터 기준일(가장 늦은 작성일, ISO 형식 문자열)과 그날 작성된 문서 키 목록
+# - 작성일은 날짜 단위이므로 기준일 당일에 나중에 수집된 문서를 증분 학습에서 구분하는 데 사용
+def data_watermark_keys(data_dir):
+    latest, keys = None, []
+    for doc in iter_records(data_dir):
+        doc_date = record_date(doc)
+        if doc_date is None:
+            continue
+        if latest is None or doc_date > latest:
+            latest, keys = doc_date, []
+        if doc_date == latest:
+            keys.append(record_key(doc))
+    return (latest.isoformat() if latest else None), keys
+
+# ✅ 데이터 기준일: 폴더에 있는 문서 중 가장 늦은 작성일 (ISO 형식 문자열, 날짜가 없으면 None)
+def data_watermark(data_dir):
+    return data_watermark_keys(data_dir)[0]
+
+# ✅ 데이터 폴더의 JSON 파일에서 문서를 하나씩 읽는 제너레이터
+# - 파일마다 iter_json_records로 스트리밍 파싱 → 메모리에는 문서 하나 + chunk만 유지
+# - data_dir이 샤드 저장소(corpus.store, manifest.json)이면 샤드에서 읽음
+def iter_records(data_dir, chunk_size=CHUNK_SIZE):
+    from corpus.store import CorpusStore, is_store
+
+    if is_store(data_dir):
+        yield from CorpusStore(data_dir).iter_records()
+        return
+    for fname in os.listdir(data_dir):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(data_dir, fname), encoding="utf-8") as f:
+            yield from iter_json_records(f, chunk_size)
+
+# ✅ (문장, 진료과) 쌍을 하나씩 반환
+def iter_examples(data_dir, chunk_size=CHUNK_SIZE):
+    for doc in iter_records(data_dir, chunk_size):
+        yield record_text(doc), doc["department"].strip()
+
+# ✅ 데이터 로딩 함수
+def load_data(data_dir):
+    import pandas as pd  # 🔸 DataFrame이 필요한 경우에만 pandas를 불러옴
+
+    texts, labels = [], []
+    for text, label in iter_examples(data_dir):
+        texts.append(text)
+        labels.append(label)
+    return pd.DataFrame({"text": texts, "label": labels})
+
+# 🔸 datasets가 gen_kwargs로 캐시를 구분하므로 파일 이름/크기/수정 시각을 함께 넘겨 원본이 바뀌면 다시 생성
+def _dir_signature(data_dir):
+    from corpus.store import CorpusStore, is_store
+
+    if is_store(data_dir):
+        return CorpusStore(data_dir).fingerprint()
+    signature = []
+    for fname in sorted(os.listdir(data_dir)):
+        if fname.endswith(".json"):
+            stat = os.stat(os.path.join(data_dir, fname))
+            signature.append((fname, stat.st_size, stat.st_mtime_ns))
+    return json.dumps(signature)  # 🔸 리스트를 넘기면 datasets가 샤드로 나눠 버리므로 문자열로 전달
+
+def _example_dicts(data_dir, signature=None):
+    for text, label in iter_examples(data_dir):
+        yield {"text": text, "label": label}
+
+# ✅ datasets.Dataset으로 불러오기
+# - Dataset.from_generator가 문서를 하나씩 받아 Arrow 파일로 기록하므로 전체 말뭉치를 메모리에 올리지 않음
+def load_dataset(data_dir, cache_dir=None):
+    from datasets import Dataset, Features, Value
+
+    return Dataset.from_generator(
+        _example_dicts,
+        features=Features({"text": Value("string"), "label": Value("string")}),
+        gen_kwargs={"data_dir": data_dir, "signature": _dir_signature(data_dir)},
+        cache_dir=cache_dir,
+    )
+
+# ✅ 레코드를 json.dump(indent=2)와 같은 형식의 JSON 배열로 하나씩 기록
+def write_json_array(records, f, indent=2):
+    pad = " " * indent
+    first = True
+    for record in records:
+        body = json.dumps(record, ensure_ascii=False, indent=indent)
+        f.write(("[\n" if first else ",\n") + "\n".join(pad + line for line in body.split("\n")))
+        first = False
+    f.write("[]" if first else "\n]")
+
+# ✅ JSON 배열 파일을 원소 단위로 읽는 제너레이터
+# - 파일 전체를 json.load 하지 않고 chunk_size씩 읽으며 레코드를 하나씩 디코딩
+# - 메모리 사용량은 파일 크기가 아니라 레코드 하나 + chunk 크기에 비례
+def iter_json_array(f, chunk_size=CHUNK_SIZE, head=""):
+    decoder = json.JSONDecoder()
+    buffer = head
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # 🔸 공백/구분자 건너뛰기, 버퍼가 비면 더 읽기
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ",")):
+                pos += 1
+            if pos < len(buffer):
+                break
+            if eof:
+                raise ValueError("JSON 배열이 닫히지 않았습니다")
+            more = f.read(chunk_size)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("JSON 배열 형식이 아닙니다")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 레코드가 chunk 경계에 걸친 경우 → 더 읽고 다시 시도
+            more = f.read(chunk_size)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        yield obj
+        pos = end
+        if pos >= chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+# ✅ JSONL(한 줄에 JSON 하나) 또는 JSON 배열을 자동 판별해 레코드를 하나씩 반환
+def iter_json_records(f, chunk_size=CHUNK_SIZE):
+    head = f.read(chunk_size)
+    while head and not head.strip():
+        more = f.read(chunk_size)
+        if not more:
+            break
+        head += more
+    if head.lstrip().startswith("["):
+        yield from iter_json_array(f, chunk_size, head)
+        return
+
+    buffer = head
+    while True:
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        more = f.read(chunk_size)
+        if not more:
+            break
+        buffer += more
+    if buffer.strip():
+        yield json.loads(buffer)
+
+# ✅ JSON 배열 파일 하나를 레코드 단위로 다시 쓰기 (data_cleaning 스크립트 공용, 파일 전체를 메모리에 올리지 않음)
+# - fn(record)는 CorpusStore.rewrite와 같음: 레코드를 직접 수정하고 변경 여부를 반환, DROP을 반환하면 삭제
+# - 임시 파일에 기록하고 변경이 있을 때만 원본과 교체, 실패하거나 변경이 없으면 임시 파일 삭제
+# - 반환: (변경 여부, 삭제된 레코드 수) / JSON 파싱 실패 시 ValueError (json.JSONDecodeError 포함)
+def rewrite_json_file(path, fn):
+    tmp_path = path + ".tmp"
+    modified, removed = False, 0
+
+    def records(f):
+        nonlocal modified, removed
+        for record in iter_json_records(f):
+            result = fn(record)
+            if result is DROP:
+                removed += 1
+                continue
+            modified = result or modified
+            yield record
+
+    try:
+        with open(path, "r", encoding="utf-8") as f, open(tmp_path, "w", encoding="utf-8") as out:
+            write_json_array(records(f), out)
+        if modified or removed:
+            os.replace(tmp_path, path)
+        return modified or bool(removed), removed
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
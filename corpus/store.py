@@ -0,0 +1,378 @@
+# 샤드 단위 말뭉치 저장소
+# - 진료과 파일 하나(JSON 배열, indent=2)를 통째로 읽고 다시 쓰는 대신
+#   파티션(기존 파일 이름, 예: "내과_train")별 JSONL 샤드에 한 줄씩 추가하고, shard_size건이 차면 새 샤드를 시작
+# - manifest.json: 샤드마다 파티션 / 형식 / 레코드 수 / 바이트 수 / sha256
+# - Parquet 샤드도 읽기 / 정제(rewrite) 지원 (변환기에서 --format parquet, pyarrow 필요) — 추가는 항상 JSONL 샤드로
+#
+# 실행 (저장소 루트에서):
+#   python -m corpus.store convert --input ./dataset/train_data --output ./dataset/train_store
+#   python -m corpus.store info ./dataset/train_store
+#   python -m corpus.store verify ./dataset/train_store
+#   python -m corpus.store export ./dataset/train_store --output ./dataset/train_data_json
+
+import argparse
+import hashlib
+import json
+import os
+from itertools import islice
+
+from corpus.loader import DROP, iter_json_records, write_json_array
+
+MANIFEST_FILE = "manifest.json"
+STORE_FORMAT = "carepick-corpus"
+STORE_VERSION = 1
+SHARD_SIZE = 10000
+SHARD_FORMATS = ("jsonl", "parquet")
+
+
+def is_store(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _jsonl_bytes(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+
+def _read_parquet(path):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=1024):
+        yield from batch.to_pylist()
+
+
+def _write_parquet(path, records):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.Table.from_pylist(list(records)), path)
+
+
+class CorpusStore:
+    def __init__(self, root, shard_size=SHARD_SIZE, create=False):
+        self.root = root
+        self.shard_size = shard_size
+        self._hashers = {}  # 샤드 경로 → 추가 중인 JSONL 샤드의 sha256 상태
+        manifest_path = os.path.join(root, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != STORE_FORMAT:
+                raise ValueError(f"말뭉치 저장소 형식이 아닙니다: {root}")
+            self.shard_size = manifest.get("shard_size", shard_size)
+            self.shards = manifest["shards"]
+            self._recover()
+        elif create:
+            os.makedirs(root, exist_ok=True)
+            self.shards = []
+            self.save()
+        else:
+            raise FileNotFoundError(f"manifest.json이 없습니다: {root}")
+
+    # ✅ manifest 저장 (임시 파일에 쓴 뒤 교체 → 중단돼도 이전 manifest 유지)
+    def save(self):
+        manifest = {
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "shard_size": self.shard_size,
+            "shards": self.shards,
+        }
+        path = os.path.join(self.root, MANIFEST_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _path(self, shard):
+        return os.path.join(self.root, shard["path"])
+
+    # 🔸 샤드 파일 전체를 다시 해시 (정제 / 복구 / Parquet 기록 후)
+    def _update(self, shard):
+        path = self._path(shard)
+        shard["bytes"] = os.path.getsize(path)
+        shard["sha256"] = file_sha256(path)
+        self._hashers.pop(shard["path"], None)
+
+    # 🔸 추가용 sha256 상태 (이 프로세스에서 샤드에 처음 추가할 때만 기존 내용을 읽고, 이후에는 추가한 바이트만 해시)
+    def _hasher(self, shard):
+        hasher = self._hashers.get(shard["path"])
+        if hasher is None:
+            hasher = hashlib.sha256()
+            with open(self._path(shard), "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(block)
+            self._hashers[shard["path"]] = hasher
+        return hasher
+
+    # 🔸 추가 도중 중단되어 파일과 manifest가 어긋난 JSONL 샤드 복구 (잘린 마지막 줄 제거 후 다시 계산)
+    def _recover(self):
+        changed = False
+        for shard in self.shards:
+            path = self._path(shard)
+            if shard["format"] != "jsonl" or os.path.getsize(path) == shard["bytes"]:
+                continue
+            with open(path, "rb+") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+            with open(path, encoding="utf-8") as f:
+                shard["records"] = sum(1 for line in f if line.strip())
+            self._update(shard)
+            changed = True
+        if changed:
+            self.save()
+
+    def partitions(self):
+        return list(dict.fromkeys(shard["partition"] for shard in self.shards))
+
+    def counts(self):
+        counts = {}
+        for shard in self.shards:
+            counts[shard["partition"]] = counts.get(shard["partition"], 0) + shard["records"]
+        return counts
+
+    def __len__(self):
+        return sum(shard["records"] for shard in self.shards)
+
+    # ✅ 저장소 내용 해시 (샤드 해시로 계산하므로 파일을 다시 읽지 않음)
+    def fingerprint(self):
+        entries = [(s["path"], s["records"], s["sha256"]) for s in self.shards]
+        return hashlib.sha256(json.dumps(entries, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _new_shard(self, partition, fmt="jsonl"):
+        index = sum(1 for shard in self.shards if shard["partition"] == partition)
+        shard = {
+            "path": f"{partition}/part-{index:05d}.{fmt}",
+            "partition": partition,
+            "format": fmt,
+            "records": 0,
+            "bytes": 0,
+            "sha256": None,
+        }
+        os.makedirs(os.path.dirname(self._path(shard)), exist_ok=True)
+        open(self._path(shard), "wb").close()
+        self._hashers[shard["path"]] = hashlib.sha256()
+        self.shards.append(shard)
+        return shard
+
+    def _open_shard(self, partition):
+        for shard in reversed(self.shards):
+            if shard["partition"] == partition:
+                if shard["format"] == "jsonl" and shard["records"] < self.shard_size:
+                    return shard
+                break
+        return self._new_shard(partition)
+
+    # ✅ 레코드 추가 (파티션의 마지막 JSONL 샤드 끝에 한 줄씩 기록, 가득 차면 새 샤드)
+    # - 바이트 수 / sha256은 추가한 부분만으로 갱신 → 추가 비용이 샤드 크기와 무관
+    def extend(self, records, partition):
+        records = iter(records)
+        added = 0
+        while True:
+            shard = self._open_shard(partition)
+            batch = list(islice(records, self.shard_size - shard["records"]))
+            if not batch:
+                if shard["records"] == 0:  # 방금 만든 빈 샤드는 남기지 않음
+                    os.remove(self._path(shard))
+                    self.shards.remove(shard)
+                    self._hashers.pop(shard["path"], None)
+                break
+            data = _jsonl_bytes(batch)
+            hasher = self._hasher(shard)
+            try:
+                with open(self._path(shard), "ab") as f:
+                    f.write(data)
+            except BaseException:
+                self._hashers.pop(shard["path"], None)  # 파일에 일부만 기록됐을 수 있음 → 다음 추가 때 다시 읽음
+                raise
+            hasher.update(data)
+            shard["records"] += len(batch)
+            shard["bytes"] += len(data)
+            shard["sha256"] = hasher.hexdigest()
+            added += len(batch)
+        self.save()
+        return added
+
+    def append(self, record, partition):
+        return self.extend([record], partition)
+
+    # ✅ Parquet 샤드로 기록 (변환기용, Parquet은 추가가 불가능하므로 shard_size건씩 새 샤드)
+    def extend_parquet(self, records, partition):
+        records = iter(records)
+        added = 0
+        while True:
+            batch = list(islice(records, self.shard_size))
+            if not batch:
+                break
+            shard = self._new_shard(partition, "parquet")
+            _write_parquet(self._path(shard), batch)
+            shard["records"] = len(batch)
+            self._update(shard)
+            added += len(batch)
+        self.save()
+        return added
+
+    # ✅ 파티션의 샤드를 모두 삭제 (manifest를 먼저 저장한 뒤 파일 삭제)
+    def remove_partition(self, partition):
+        removed = [shard for shard in self.shards if shard["partition"] == partition]
+        self.shards = [shard for shard in self.shards if shard["partition"] != partition]
+        self.save()
+        for shard in removed:
+            os.remove(self._path(shard))
+            self._hashers.pop(shard["path"], None)
+        return sum(shard["records"] for shard in removed)
+
+    def _iter_shard(self, shard):
+        path = self._path(shard)
+        if shard["format"] == "parquet":
+            yield from _read_parquet(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield from iter_json_records(f)
+
+    # ✅ 레코드를 하나씩 반환 (partition을 지정하면 해당 파티션만)
+    def iter_records(self, partition=None):
+        for shard in list(self.shards):
+            if partition is None or shard["partition"] == partition:
+                yield from self._iter_shard(shard)
+
+    # ✅ 샤드 단위 정제
+    # - fn(record)가 레코드를 직접 수정하고 변경 여부를 반환 (data_cleaning 스크립트의 레코드 함수)
+    #   DROP을 반환하면 레코드를 삭제
+    # - 샤드를 임시 파일에 다시 쓰고 변경이 있는 샤드만 교체 → 메모리 사용량은 샤드 하나 이하
+    def rewrite(self, fn):
+        changed = []
+        try:
+            for shard in self.shards:
+                path = self._path(shard)
+                tmp_path = path + ".tmp"
+                modified, kept = False, 0
+
+                def records():
+                    nonlocal modified, kept
+                    for record in self._iter_shard(shard):
+                        result = fn(record)
+                        if result is DROP:
+                            modified = True
+                            continue
+                        modified = result or modified
+                        kept += 1
+                        yield record
+
+                # 🔸 fn / 기록 중 예외가 나거나 변경이 없으면 임시 파일 삭제 (corpus.loader.rewrite_json_file과 같음)
+                try:
+                    if shard["format"] == "parquet":
+                        _write_parquet(tmp_path, records())
+                    else:
+                        with open(tmp_path, "wb") as f:
+                            for record in records():
+                                f.write(_jsonl_bytes([record]))
+
+                    if modified:
+                        os.replace(tmp_path, path)
+                        shard["records"] = kept
+                        self._update(shard)
+                        changed.append(shard["path"])
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        finally:
+            if changed:
+                self.save()  # 중간에 실패해도 이미 교체한 샤드는 manifest에 반영
+        return changed
+
+    # ✅ 샤드 단위 레코드 삭제 (keep(record)가 False인 레코드 제거, 바뀐 샤드만 교체) → 삭제된 레코드 수
+    def filter(self, keep):
+        before = len(self)
+        self.rewrite(lambda record: False if keep(record) else DROP)
+        return before - len(self)
+
+    # ✅ 샤드 파일이 manifest의 레코드 수 / 해시와 일치하는지 확인 → 문제 목록
+    def verify(self):
+        problems = []
+        for shard in self.shards:
+            path = self._path(shard)
+            if not os.path.exists(path):
+                problems.append(f"{shard['path']}: 파일 없음")
+                continue
+            if file_sha256(path) != shard["sha256"]:
+                problems.append(f"{shard['path']}: sha256 불일치")
+            count = sum(1 for _ in self._iter_shard(shard))
+            if count != shard["records"]:
+                problems.append(f"{shard['path']}: 레코드 수 불일치 (manifest {shard['records']}, 실제 {count})")
+        return problems
+
+
+# ✅ 기존 JSON 배열 폴더 → 저장소 (파일 이름이 파티션 이름, 파일은 스트리밍으로 읽음)
+def convert(input_dir, output_dir, shard_size=SHARD_SIZE, fmt="jsonl"):
+    store = CorpusStore(output_dir, shard_size, create=True)
+    for fname in sorted(os.listdir(input_dir)):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(input_dir, fname), encoding="utf-8") as f:
+            records = iter_json_records(f)
+            if fmt == "parquet":
+                added = store.extend_parquet(records, fname[:-len(".json")])
+            else:
+                added = store.extend(records, fname[:-len(".json")])
+        print(f"✅ {fname}: {added}건")
+    return store
+
+
+# ✅ 저장소 → 파티션별 JSON 배열 파일 (기존 형식, indent=2)
+def export(store, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    for partition in store.partitions():
+        with open(os.path.join(output_dir, f"{partition}.json"), "w", encoding="utf-8") as f:
+            write_json_array(store.iter_records(partition), f)
+        print(f"✅ {partition}.json")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="샤드 단위 말뭉치 저장소")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="JSON 배열 폴더를 저장소로 변환")
+    conv.add_argument("--input", required=True)
+    conv.add_argument("--output", required=True)
+    conv.add_argument("--format", choices=SHARD_FORMATS, default="jsonl")
+    conv.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+
+    info = sub.add_parser("info", help="파티션별 레코드 수 출력")
+    info.add_argument("path")
+
+    verify = sub.add_parser("verify", help="샤드 레코드 수 / 해시 검증")
+    verify.add_argument("path")
+
+    exp = sub.add_parser("export", help="저장소를 JSON 배열 폴더로 내보내기")
+    exp.add_argument("path")
+    exp.add_argument("--output", required=True)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "convert":
+        if is_store(args.output):
+            raise SystemExit(f"이미 저장소가 있습니다: {args.output}")
+        store = convert(args.input, args.output, args.shard_size, args.format)
+        print(f"✅ 변환 완료: {args.output} ({len(store)}건, 샤드 {len(store.shards)}개)")
+    elif args.command == "info":
+        store = CorpusStore(args.path)
+        for partition, count in store.counts().items():
+            print(f"{partition:<20} {count:>8}건")
+        print(f"✅ 총 {len(store)}건, 샤드 {len(store.shards)}개")
+    elif args.command == "verify":
+        problems = CorpusStore(args.path).verify()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("✅ 모든 샤드가 manifest와 일치합니다")
+    else:
+        export(CorpusStore(args.path), args.output)
@@ -0,0 +1,115 @@
+# 버퍼링 레코드 기록기 (수집기용)
+# - 레코드를 파티션(예: "내과_train")별로 메모리에 모았다가 batch_size건이 차면 샤드 저장소(corpus.store)에 한 번에 추가
+#   → 레코드 한 건당 기록 비용이 파일 크기와 무관하게 일정
+# - 별도 타이머는 없음: write() 때 마지막 flush 후 flush_interval초가 지났으면 batch_size 전이라도 저장
+#   (레코드가 더 들어오지 않는 동안에는 flush() / close()를 직접 호출해야 기록됨)
+# - 추가는 JSONL 샤드 끝에 붙이고 manifest는 임시 파일 교체로 저장하므로, 중단돼도 이전까지 기록한 배치는 유지
+#   (잘린 마지막 줄은 다음 실행 때 CorpusStore가 복구)
+# - on_flush(records): 배치가 저장소에 기록된 뒤 호출 (예: 수집기가 저장이 끝난 질문만 중복 색인에 등록)
+# - compact(): 쌓인 레코드를 기존 JSON 배열 파일(<파티션>.json, indent=2)에 합쳐 임시 파일 → 교체로 다시 쓰고 저장소에서 삭제
+#   (교체 전에 저장소 폴더의 compact.json에 합칠 파티션을 기록 → 교체와 삭제 사이에 중단되면 다음 실행 때 이어서 마무리)
+#
+# 사용 예:
+#   with RecordWriter("./.cache/train_spool") as writer:
+#       writer.write(record, "내과_train")
+#   writer.compact("./train_data")
+
+import json
+import os
+import time
+from itertools import chain
+
+from corpus.loader import iter_json_records, write_json_array
+from corpus.store import CorpusStore
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 5.0  # 초
+COMPACT_FILE = "compact.json"
+
+
+class RecordWriter:
+    def __init__(self, root, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, on_flush=None):
+        self.store = CorpusStore(root, create=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.buffers = {}
+        self.pending = 0
+        self.written = 0
+        self.last_flush = time.monotonic()
+        self._compact_path = os.path.join(root, COMPACT_FILE)
+        self._finish_compact()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ✅ 레코드 한 건 추가 (버퍼가 차거나 마지막 flush 후 flush_interval초가 지났으면 저장)
+    def write(self, record, partition):
+        self.buffers.setdefault(partition, []).append(record)
+        self.pending += 1
+        if self.pending >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        for partition, records in self.buffers.items():
+            self.written += self.store.extend(records, partition)
+            if self.on_flush:
+                self.on_flush(records)
+        self.buffers = {}
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    # 🔸 합치기 진행 기록 (파티션 → 대상 JSON 파일 경로, 임시 파일에 쓴 뒤 교체)
+    def _save_compact(self, pending):
+        if not pending:
+            if os.path.exists(self._compact_path):
+                os.remove(self._compact_path)
+            return
+        with open(self._compact_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(pending, f, ensure_ascii=False, indent=2)
+        os.replace(self._compact_path + ".tmp", self._compact_path)
+
+    # 🔸 중단된 합치기 마무리 (roll forward)
+    # - 임시 파일이 남아 있으면 아직 교체 전 → 교체부터, 없으면 교체는 끝난 것 → 저장소에서 파티션 삭제만
+    def _finish_compact(self):
+        if not os.path.exists(self._compact_path):
+            return {}
+        with open(self._compact_path, encoding="utf-8") as f:
+            pending = json.load(f)
+        merged = {}
+        for partition, path in list(pending.items()):
+            if os.path.exists(path + ".tmp"):
+                os.replace(path + ".tmp", path)
+            merged[partition] = self.store.remove_partition(partition)
+            del pending[partition]
+            self._save_compact(pending)
+            print(f"☑️ 중단된 합치기 마무리: {partition} → {path}")
+        return merged
+
+    # ✅ 저장소의 레코드를 output_dir의 JSON 배열 파일로 합치기 (기존 레코드 뒤에 추가)
+    # - 파티션마다 기존 파일과 샤드를 스트리밍으로 읽어 임시 파일에 쓰고, compact.json에 기록한 뒤 교체
+    #   → 교체 전에 중단되면 기존 파일은 그대로, 교체 후 저장소 삭제 전에 중단되면 다음 실행 때 삭제만 진행 (중복 없음)
+    # - 반환: {파티션: 합친 레코드 수}
+    def compact(self, output_dir):
+        self.flush()
+        os.makedirs(output_dir, exist_ok=True)
+        merged = self._finish_compact()
+        for partition in self.store.partitions():
+            path = os.path.join(output_dir, f"{partition}.json")
+            with open(path + ".tmp", "w", encoding="utf-8") as out:
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as f:
+                        write_json_array(chain(iter_json_records(f), self.store.iter_records(partition)), out)
+                else:
+                    write_json_array(self.store.iter_records(partition), out)
+            self._save_compact({partition: path})
+            os.replace(path + ".tmp", path)
+            merged[partition] = merged.get(partition, 0) + self.store.remove_partition(partition)
+            self._save_compact({})
+        return merged
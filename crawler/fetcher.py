@@ -0,0 +1,107 @@
+# 비동기 HTTP 수집 엔진 (aiohttp)
+# - 세션 하나에서 keep-alive 연결을 재사용 (호스트별 연결 풀)
+# - 동시 요청 수 제한 (concurrency)
+# - 호스트별 토큰 버킷 속도 제한 (초당 rate개, 최대 burst개까지 몰아서 허용) → 고정 sleep 대신 사이트 부하를 일정하게 유지
+# - 연결 오류 / 타임아웃 / 429 / 5xx는 지수 백오프(+지터)로 재시도, Retry-After 헤더가 있으면 그 값을 따름
+#
+# 사용 예:
+#   async with AsyncFetcher(concurrency=8, rate=2.0) as fetcher:
+#       res = await fetcher.get("https://kin.naver.com/search/list.nhn", params={...})
+#       res.status, res.text
+
+import asyncio
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+FetchResponse = namedtuple("FetchResponse", ["status", "text", "url"])
+
+
+# ✅ 토큰 버킷: 초당 rate개씩 토큰이 차고 최대 burst개까지 쌓임, 요청마다 토큰 1개 사용
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:  # 🔸 대기 순서대로 토큰을 받도록 잠금 안에서 기다림
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    def __init__(self, concurrency=8, rate=2.0, burst=2, retries=3, backoff=0.5, timeout=10, headers=None):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.headers = headers or HEADERS
+        self.session = None
+        self._semaphore = None
+        self._buckets = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.5)
+
+    # ✅ GET 요청 → FetchResponse(status, text, url)
+    # - 재시도 후에도 실패하면 마지막 상태 코드를 그대로 반환 (연결 오류는 status=None)
+    # - 동시 요청 슬롯은 요청 한 번 동안만 잡음 → 백오프 대기 중에는 다른 요청이 슬롯을 사용
+    async def get(self, url, params=None):
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            async with self._semaphore:
+                await self._bucket(url).acquire()
+                self.stats["requests"] += 1
+                try:
+                    async with self.session.get(url, params=params) as res:
+                        text = await res.text(errors="replace")
+                        if res.status not in RETRY_STATUSES:
+                            return FetchResponse(res.status, text, str(res.url))
+                        retry_after = res.headers.get("Retry-After")
+                        result = FetchResponse(res.status, text, str(res.url))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result = FetchResponse(None, f"{type(e).__name__}: {e}", url)
+
+            if attempt < self.retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        self.stats["failures"] += 1
+        return result
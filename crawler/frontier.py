@@ -0,0 +1,88 @@
+# 수집 진행 상태(frontier) 저장 → 중단된 월 수집을 이어서 실행
+# - 날짜별 다음 목록 페이지 / 완료 여부, 요청했지만 아직 저장되지 않은 상세 URL(in-flight, URL → 날짜), 수집 건수(저장소에 기록된 건수)
+# - save_interval초마다(및 종료 시) JSON 파일로 저장 (임시 파일 → 교체)
+# - 상세 URL은 수집 결과가 저장소에 기록된 뒤(RecordWriter flush) in-flight에서 제거
+#   → 중단되면 버퍼에만 있던 질문도 다음 실행에서 다시 요청
+#
+# 파일 예 (.cache/frontier_2025_02.json):
+#   {"format": "carepick-frontier", "version": 1, "period": "2025-02", "collected": 120,
+#    "days": {"2025-02-01": {"next_page": 4, "done": true}}, "inflight": {"https://...": "2025-02-03"}}
+
+import json
+import os
+import time
+
+FRONTIER_FORMAT = "carepick-frontier"
+FRONTIER_VERSION = 1
+SAVE_INTERVAL = 10.0  # 초
+
+
+class CrawlFrontier:
+    def __init__(self, path, period, resume=False, save_interval=SAVE_INTERVAL):
+        self.path = path
+        self.period = period
+        self.save_interval = save_interval
+        self.days = {}
+        self.inflight = {}
+        self.collected = 0  # 저장소에 기록된 건수 (파일에 저장)
+        self.reserved = 0   # 이번 실행에서 요청 중이거나 기록 대기 중인 건수 (월 최대 건수 계산용, 저장하지 않음)
+        self.resumed = False
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("format") != FRONTIER_FORMAT or state.get("period") != period:
+                raise ValueError(f"{period} 수집 상태 파일이 아닙니다: {path}")
+            self.days = state["days"]
+            self.inflight = state["inflight"]
+            self.collected = state["collected"]
+            self.resumed = True
+        self.last_save = time.monotonic()
+
+    def _day(self, day):
+        return self.days.setdefault(day.strftime("%Y-%m-%d"), {"next_page": 1, "done": False})
+
+    def next_page(self, day):
+        return self._day(day)["next_page"]
+
+    def is_done(self, day):
+        return self._day(day)["done"]
+
+    # ✅ 목록 페이지 하나의 상세 요청이 모두 끝나면 다음 페이지로
+    def page_done(self, day, page):
+        self._day(day)["next_page"] = page + 1
+        self.maybe_save()
+
+    def day_done(self, day):
+        self._day(day)["done"] = True
+        self.maybe_save()
+
+    # ✅ 월 최대 건수와 비교할 건수 (저장된 건수 + 요청 중 / 기록 대기 중인 건수)
+    def total(self):
+        return self.collected + self.reserved
+
+    def add_inflight(self, urls, day):
+        for url in urls:
+            self.inflight[url] = day.strftime("%Y-%m-%d")
+
+    def remove_inflight(self, urls):
+        for url in urls:
+            self.inflight.pop(url, None)
+
+    def maybe_save(self):
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        state = {
+            "format": FRONTIER_FORMAT,
+            "version": FRONTIER_VERSION,
+            "period": self.period,
+            "collected": self.collected,
+            "days": self.days,
+            "inflight": self.inflight,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+        self.last_save = time.monotonic()
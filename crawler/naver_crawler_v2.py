@@ -1,18 +1,64 @@
-import requests
+# 네이버 지식iN 전문의 답변 수집
+# - 요청은 crawler.fetcher.AsyncFetcher로 처리 (keep-alive 연결 재사용 / 동시 요청 수 제한 / 호스트별 토큰 버킷 / 재시도)
+# - 하루 단위 기간을 동시에 수집하고, 목록 페이지의 상세 페이지들도 동시에 요청
+#
+# - 날짜별 진행 페이지 / 저장 전 상세 URL을 crawler.frontier로 주기적으로 저장 → --resume으로 중단된 곳부터 이어서 수집
+#
+# 실행 (저장소 루트에서):
+#   python -m crawler.naver_crawler_v2 --year 2025 --months 1 2 3
+#   python -m crawler.naver_crawler_v2 --year 2025 --months 1 2 3 --resume
+#   python -m crawler.naver_crawler_v2  # 저장된 질문 수만 출력
+
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+import argparse
+import asyncio
 import calendar
-import time
 import json
 import os
 
+from crawler.fetcher import AsyncFetcher
+from crawler.frontier import CrawlFrontier
+from crawler.profile_cache import PROFILE_DB, PROFILE_TTL, ProfileCache
+from crawler.seen_index import SEEN_DB, SeenIndex, question_key
+
 QUERY = "안녕하세요"
-BASE_URL = "https://kin.naver.com/search/list.nhn"
+KIN_HOST = "https://kin.naver.com"
+BASE_URL = f"{KIN_HOST}/search/list.nhn"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 MAX_POSTS_PER_MONTH = 7000
 MAX_PAGE = 100
 CRAWL_MONTH = 1
 OUTPUT_DIR = "./train_data"
+# 🔸 지정하면 진료과별 JSON 파일 대신 샤드 저장소(corpus.store)에 바로 기록
+STORE_DIR = None  # 예: "./train_store"
+# ✅ 수집 결과는 corpus.writer.RecordWriter로 모아서 기록 (WRITE_BATCH건마다, 마지막 기록 후 WRITE_INTERVAL초가 지났으면 다음 레코드 때)
+# - STORE_DIR이 없으면 SPOOL_DIR 저장소에 쌓았다가 월 수집이 끝날 때 OUTPUT_DIR의 JSON 배열 파일로 합침
+SPOOL_DIR = "./.cache/train_spool"
+WRITE_BATCH = 100
+WRITE_INTERVAL = 5.0
+
+# ✅ 수집 엔진 설정
+CONCURRENCY = 8      # 동시 요청 수
+RATE_PER_HOST = 3.0  # 호스트별 초당 요청 수
+BURST = 3            # 호스트별 순간 최대 요청 수
+RETRIES = 3
+TIMEOUT = 10
+DAY_CONCURRENCY = 4  # 동시에 수집하는 날짜 수
+
+# ✅ 의사 프로필 캐시 (PROFILE_DB, 여러 실행 / 프로세스가 공유, PROFILE_TTL이 지나면 다시 요청)
+_profile_cache = None
+
+# ✅ 수집한 질문 색인 (SEEN_DB, docId 기준, 이전 실행에서 저장한 질문은 상세 페이지를 요청하지 않음)
+_seen_index = None
+_claimed = set()  # 이번 실행에서 요청 중이거나 저장한 질문 키 (동시에 수집하는 날짜 간 중복 방지)
+seen_skipped = 0
+
+_writer = None
+
+# ✅ 월별 수집 진행 상태 파일
+FRONTIER_PATH = "./.cache/frontier_{year}_{month:02d}.json"
+_frontier = None
 
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
@@ -29,68 +75,124 @@ def is_valid_date(date_str, start_dt, end_dt):
         return False
 
 
-def extract_department(profile_url):
-    try:
-        res = requests.get(profile_url, headers=HEADERS, timeout=3)
-        if res.status_code != 200:
-            return "ERROR"
-        soup = BeautifulSoup(res.text, "html.parser")
-        profile_section = soup.select_one("div.my_doctor div.my_personal_inner div.profile_section2 div.pro_intro dl.pro_name dd span")
-        if not profile_section:
-            return "ERROR"
-        raw_text = profile_section.get_text(strip=True)
-        if "치과의사" in raw_text:
-            return "치과"
-        department = raw_text.replace("전문의", "").strip()
-        return department
-    except Exception as e:
-        print(f"❌ 프로필 페이지 오류: {profile_url} -> {e}")
+def parse_department(soup):
+    profile_section = soup.select_one("div.my_doctor div.my_personal_inner div.profile_section2 div.pro_intro dl.pro_name dd span")
+    if not profile_section:
         return "ERROR"
-    
-def extract_doctor_name(profile_url):
+    raw_text = profile_section.get_text(strip=True)
+    if "치과의사" in raw_text:
+        return "치과"
+    department = raw_text.replace("전문의", "").strip()
+    return department
+
+
+def parse_doctor_name(soup):
+    profile_section = soup.select_one("div.my_doctor div.my_personal_inner div.profile_section2 div.pro_intro dl > dt")
+    if not profile_section:
+        print("의사 이름 추출 실패: 선택자 불일치")
+        return "ERROR"
+    doctor_name = profile_section.get_text(strip=True)
+    return doctor_name
+
+
+# ✅ 프로필 페이지 한 번 요청 / 파싱으로 (진료과, 의사 이름)을 함께 추출
+async def fetch_profile(fetcher, profile_url):
     try:
-        res = requests.get(profile_url, headers=HEADERS, timeout=3)
-        if res.status_code != 200:
-            return "ERROR"
+        res = await fetcher.get(profile_url)
+        if res.status != 200:
+            return "ERROR", "ERROR"
         soup = BeautifulSoup(res.text, "html.parser")
-        profile_section = soup.select_one("div.my_doctor div.my_personal_inner div.profile_section2 div.pro_intro dl > dt")
-        if not profile_section:
-            print("의사 이름 추출 실패: 선택자 불일치")
-            return "ERROR"
-        doctor_name = profile_section.get_text(strip=True)
-        return doctor_name
-    except Exception as e:
-        print(f"❌ 의사 이름 추출 중 오류 발생: {profile_url} -> {e}")
-        return "ERROR"
+        return parse_department(soup), parse_doctor_name(soup)
     except Exception as e:
         print(f"❌ 프로필 페이지 오류: {profile_url} -> {e}")
-        return "ERROR"
+        return "ERROR", "ERROR"
+
+
+# ✅ 프로필 캐시(crawler.profile_cache)를 거쳐 추출 → 대부분의 질문은 프로필 요청 없이 처리
+async def extract_profile(fetcher, profile_url):
+    return await get_profile_cache().get_or_fetch(profile_url, lambda url: fetch_profile(fetcher, url))
+
+
+def get_profile_cache():
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = ProfileCache(PROFILE_DB, PROFILE_TTL)
+    return _profile_cache
+
+
+def get_seen_index():
+    global _seen_index
+    if _seen_index is None:
+        _seen_index = SeenIndex(SEEN_DB)
+    return _seen_index
+
+
+# 🔸 저장소에 기록된 질문만 색인에 등록하고 in-flight에서 제거 + 수집 건수에 반영
+# - 버퍼에만 있다가 중단되면 다음 실행에서 다시 수집하므로 저장 건수(collected)도 저장된 것만 셈
+def mark_seen(records):
+    urls = [record["question_url"] for record in records]
+    get_seen_index().add_many(urls)
+    if _frontier is not None:
+        _frontier.remove_inflight(urls)
+        _frontier.collected += len(records)
+        _frontier.reserved -= len(records)
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        from corpus.writer import RecordWriter
+        _writer = RecordWriter(STORE_DIR or SPOOL_DIR, WRITE_BATCH, WRITE_INTERVAL, on_flush=mark_seen)
+    return _writer
+
+
+# ✅ 아직 수집하지 않은 상세 URL만 남기고 이번 실행에서 수집 중으로 표시
+def claim_new_urls(urls):
+    global seen_skipped
+    index = get_seen_index()
+    fresh = []
+    for url in urls:
+        key = question_key(url)
+        if key in _claimed or url in index:
+            seen_skipped += 1
+            continue
+        _claimed.add(key)
+        fresh.append(url)
+    return fresh
+
+
+# ✅ 월 최대 수집 건수까지 남은 만큼만 상세 URL 예약 (요청 중 / 기록 대기 중인 질문도 포함해서 셈)
+# - 남은 URL은 이번 실행의 수집 중 표시를 해제 → (모두 담았는지 여부, 예약한 URL)
+def reserve_urls(frontier, urls):
+    room = max(0, MAX_POSTS_PER_MONTH - frontier.total())
+    taken, rest = urls[:room], urls[room:]
+    for url in rest:
+        _claimed.discard(question_key(url))
+    frontier.reserved += len(taken)
+    return not rest, taken
 
 
 def save_to_file(data, department):
-    if department == "":
-        filename = os.path.join(OUTPUT_DIR, f"미분류_train.json")
-    else:
-        filename = os.path.join(OUTPUT_DIR, f"{department}_train.json")
-        
-    if os.path.exists(filename):
-        with open(filename, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-    else:
-        existing_data = []
+    partition = "미분류_train" if department == "" else f"{department}_train"
+    get_writer().write(data, partition)
 
-    existing_data.append(data)
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(existing_data, f, ensure_ascii=False, indent=2)
+# ✅ 버퍼에 남은 레코드 저장 → (STORE_DIR이 없으면) JSON 배열 파일로 합치기
+def flush_results():
+    writer = get_writer()
+    if STORE_DIR:
+        writer.flush()
+        return
+    for partition, count in writer.compact(OUTPUT_DIR).items():
+        print(f"💾 {partition}.json에 {count}건 추가")
 
 
-def get_detail_content(url, start_dt, end_dt):
+async def get_detail_content(fetcher, url, start_dt, end_dt):
     try:
         
         print(url)
-        res = requests.get(url, headers=HEADERS, timeout=3)
-        if res.status_code != 200:
+        res = await fetcher.get(url)
+        if res.status != 200:
             return "ERROR"
 
         soup = BeautifulSoup(res.text, "html.parser")
@@ -137,7 +239,7 @@ def get_detail_content(url, start_dt, end_dt):
             return "ERROR"
 
         if not profile_url.startswith("http"):
-            profile_url = f"https://kin.naver.com{profile_url}"
+            profile_url = f"{KIN_HOST}{profile_url}"
         
         profile_link_tag = soup.select_one("div._contentBox div.profile_card._profileCardArea a[href]")
         
@@ -146,15 +248,14 @@ def get_detail_content(url, start_dt, end_dt):
         
         profile_url = profile_link_tag.get("href")
         if not profile_url.startswith("http"):
-            profile_url = f"https://kin.naver.com{profile_url}"
+            profile_url = f"{KIN_HOST}{profile_url}"
             
         
-        department = extract_department(profile_url)
+        department, doctor_name = await extract_profile(fetcher, profile_url)
         if department == "ERROR":
             print("진료과 추출 에러")
             return "ERROR"
         
-        doctor_name = extract_doctor_name(profile_url)
         if doctor_name == "ERROR":
             print("의사명 추출 에러")
             return "ERROR"
@@ -178,77 +279,154 @@ def get_detail_content(url, start_dt, end_dt):
         return "ERROR"
 
 
-def crawl_month(year, month):
+# ✅ 예약한 상세 페이지들을 동시에 요청 (저장되지 않은 URL은 바로 in-flight / 예약에서 제거)
+async def collect_details(fetcher, detail_urls, current_start, current_end, total_results, frontier):
+    results = await asyncio.gather(*(
+        get_detail_content(fetcher, detail_url, current_start, current_end) for detail_url in detail_urls
+    ))
+    for detail_url, result in zip(detail_urls, results):
+        if result not in ["OUT_OF_RANGE", "ERROR"]:
+            total_results.append(result)  # 저장 건수(frontier.collected)는 저장소에 기록될 때 mark_seen에서 증가
+        else:
+            _claimed.discard(question_key(detail_url))  # 🔸 끌올 등으로 다른 날짜 목록에서 다시 나오면 수집 가능
+            frontier.remove_inflight([detail_url])
+            frontier.reserved -= 1
+
+
+# ✅ 하루치 수집: 목록 페이지는 순서대로, 페이지 안의 상세 페이지들은 동시에 요청
+# - frontier에 기록된 다음 페이지부터 시작, 페이지의 상세 요청이 모두 끝나면 완료로 기록
+async def crawl_day(fetcher, current_start, current_end, total_results, frontier):
+    period_str = f"{current_start.strftime('%Y.%m.%d.')}|{current_end.strftime('%Y.%m.%d.')}"
+    if frontier.is_done(current_start):
+        return
+    print(f"🗓️ {period_str} 수집 중...")
+
+    page = frontier.next_page(current_start)
+    while frontier.total() < MAX_POSTS_PER_MONTH and page <= MAX_PAGE:
+        params = {
+            "sort": "date",
+            "query": QUERY, 
+            "period": period_str,
+            "section": "qna",
+            "dirId": 701,
+            "page": page
+        }
+
+        try:
+            res = await fetcher.get(BASE_URL, params=params)
+            if res.status != 200:
+                # 🔸 빈 목록으로 보고 날짜를 완료 처리하지 않음 → 다음 실행(--resume)에서 이 페이지부터 다시 요청
+                print(f"❌ 목록 페이지 요청 실패: {period_str} {page}페이지 (status {res.status})")
+                return
+            soup = BeautifulSoup(res.text, "html.parser")
+            items = soup.select("ul.basic1 > li")
+            if not items:
+                break
+            
+            print(f"{period_str} {page}번째 페이지 조회중...")
+
+            detail_urls = []
+            for item in items:
+                a_tag = item.select_one("dl dt > a")
+                href = a_tag.get("href") if a_tag else None
+                if href:
+                    detail_urls.append(href if href.startswith("http") else f"{KIN_HOST}{href}")
+
+            complete, detail_urls = reserve_urls(frontier, claim_new_urls(detail_urls))
+            frontier.add_inflight(detail_urls, current_start)
+            await collect_details(fetcher, detail_urls, current_start, current_end, total_results, frontier)
+            if not complete:
+                return  # 🔸 월 최대 건수에 도달 → 남은 질문이 있는 페이지는 완료로 기록하지 않음
+            frontier.page_done(current_start, page)
+            page += 1
+
+        except Exception as e:
+            print(f"❌ 페이지 요청 오류: {e}")
+            return
+
+    if frontier.total() < MAX_POSTS_PER_MONTH:
+        frontier.day_done(current_start)
+
+
+# ✅ 이전 실행에서 요청했지만 저장되지 않은 상세 URL을 먼저 다시 요청
+async def retry_inflight(fetcher, total_results, frontier):
+    by_day = {}
+    for url, day in list(frontier.inflight.items()):
+        by_day.setdefault(day, []).append(url)
+    for day, urls in by_day.items():
+        fresh = claim_new_urls(urls)
+        frontier.remove_inflight(set(urls) - set(fresh))  # 이미 저장된 질문
+        _, fresh = reserve_urls(frontier, fresh)  # 넘치는 URL은 in-flight에 남겨 다음 실행에서 다시 요청
+        day_dt = datetime.strptime(day, "%Y-%m-%d")
+        await collect_details(fetcher, fresh, day_dt, day_dt, total_results, frontier)
+
+
+async def crawl_month(year, month, fetcher=None, resume=False):
+    global _frontier
+    if fetcher is None:
+        async with AsyncFetcher(CONCURRENCY, RATE_PER_HOST, BURST, RETRIES, timeout=TIMEOUT, headers=HEADERS) as fetcher:
+            return await crawl_month(year, month, fetcher, resume)
+
     start_dt = datetime(year, month, 1)
     last_day = calendar.monthrange(year, month)[1]
     end_dt = datetime(year, month, last_day)
     
+    _claimed.clear()  # 🔸 이전 (중단된) 수집에서 요청 중이던 질문도 다시 요청할 수 있도록
+    frontier = _frontier = CrawlFrontier(FRONTIER_PATH.format(year=year, month=month), f"{year}-{month:02d}", resume)
+    if frontier.resumed:
+        done = sum(1 for day in frontier.days.values() if day["done"])
+        print(f"↩️ {year}년 {month}월 이어서 수집: 완료 {done}일, 수집 {frontier.collected}건, 재요청 {len(frontier.inflight)}건")
+
     total_results = []
+    day_slots = asyncio.Semaphore(DAY_CONCURRENCY)
 
-    # 하루 단위로 범위 분할
-    current_start = start_dt
-    while current_start <= end_dt:
-        
-        if len(total_results) >= MAX_POSTS_PER_MONTH:
-            break
-        
-        current_end = min(current_start + timedelta(days=0), end_dt)
-        period_str = f"{current_start.strftime('%Y.%m.%d.')}|{current_end.strftime('%Y.%m.%d.')}"
-        print(f"🗓️ {period_str} 수집 중...")
-        
-        page = 1
-        
-        while len(total_results) < MAX_POSTS_PER_MONTH and page <= MAX_PAGE:
-            params = {
-                "sort": "date",
-                "query": QUERY, 
-                "period": period_str,
-                "section": "qna",
-                "dirId": 701,
-                "page": page
-            }
-
-            try:
-                res = requests.get(BASE_URL, headers=HEADERS, params=params, timeout=3)
-                soup = BeautifulSoup(res.text, "html.parser")
-                items = soup.select("ul.basic1 > li")
-                if not items:
-                    break
-                
-                print(f"{page}번째 페이지 조회중...")
-
-                for item in items:
-                    a_tag = item.select_one("dl dt > a")
-                    href = a_tag.get("href") if a_tag else None
-                    if href:
-                        detail_url = href if href.startswith("http") else f"https://kin.naver.com{href}"
-                        result = get_detail_content(detail_url, current_start, current_end)
-                        
-                        if result not in ["OUT_OF_RANGE", "ERROR"]:
-                            total_results.append(result)
-
-                page += 1
-                time.sleep(0.3)
-
-            except Exception as e:
-                print(f"❌ 페이지 요청 오류: {e}")
-                break
-        
-        # 다음 범위로 이동
-        current_start = current_end + timedelta(days=1)
-        page = 1
-        time.sleep(0.3)
+    async def run_day(day):
+        async with day_slots:
+            if frontier.total() < MAX_POSTS_PER_MONTH:
+                await crawl_day(fetcher, day, day, total_results, frontier)
 
+    try:
+        await retry_inflight(fetcher, total_results, frontier)
+        # 하루 단위로 범위 분할 (요청 간격은 fetcher의 호스트별 속도 제한으로 조절)
+        days = [start_dt + timedelta(days=n) for n in range((end_dt - start_dt).days + 1)]
+        await asyncio.gather(*(run_day(day) for day in days))
+        flush_results()
+    finally:
+        # 🔸 오류 / 중단 시에도 버퍼의 레코드를 저장한 뒤 진행 상태 저장
+        get_writer().flush()
+        frontier.save()
+        _frontier = None
+
+    profiles = get_profile_cache()
+    print(f"📊 요청 {fetcher.stats['requests']}회 (재시도 {fetcher.stats['retries']}회, 실패 {fetcher.stats['failures']}회), "
+          f"프로필 캐시 적중 {profiles.hits}회 / 요청 {profiles.misses}회, 이미 수집한 질문 {seen_skipped}건 건너뜀")
     return total_results
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="네이버 지식iN 전문의 답변 수집")
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--months", type=int, nargs="*", default=[], help="수집할 월 (지정하지 않으면 저장된 질문 수만 출력)")
+    parser.add_argument("--resume", action="store_true", help="진행 상태 파일에서 이어서 수집 (완료한 페이지는 다시 요청하지 않음)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    # print(f"\n======= 수집 시작 =======")
-    # for month in range(1, 4):
-    #     crawl_month(2025, month)
-    #     time.sleep(1)
+    args = parse_args()
+    if args.months:
+        print(f"\n======= 수집 시작 =======")
+    for month in args.months:
+        asyncio.run(crawl_month(args.year, month, resume=args.resume))
 
-    #     print(f"\n✅{month}월 데이터 수집 완료")
+        print(f"\n✅{month}월 데이터 수집 완료")
         
+    if STORE_DIR:
+        store = get_writer().store
+        for partition, count in store.counts().items():
+            print(f"{partition}의 데이터 개수 {count}개, {count / 25212 * 100}%")
+        print(f"✅총 저장된 질문 수: {len(store)}건")
+        raise SystemExit(0)
+
     total = 0
     for file in os.listdir(OUTPUT_DIR):
             if file.endswith(".json"):
@@ -0,0 +1,68 @@
+# 의사 프로필 캐시 (SQLite)
+# - 프로필 URL → (진료과, 의사 이름), 저장 시각 기준 TTL이 지나면 다시 요청
+# - 같은 DB 파일을 여러 수집 실행 / 프로세스가 함께 사용 (WAL 모드 + busy timeout)
+# - 같은 프로필을 동시에 여러 질문이 요청하면 한 번만 가져오고 결과를 나눠 가짐
+
+import asyncio
+import os
+import sqlite3
+import time
+
+PROFILE_DB = "./.cache/profiles.sqlite"
+PROFILE_TTL = 30 * 24 * 3600  # 30일
+
+
+class ProfileCache:
+    def __init__(self, db_path=PROFILE_DB, ttl=PROFILE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "url TEXT PRIMARY KEY, department TEXT NOT NULL, doctor TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    # 🔸 TTL 안의 값만 반환 (없거나 만료되면 None)
+    def get(self, url):
+        row = self.db.execute(
+            "SELECT department, doctor FROM profiles WHERE url = ? AND fetched_at >= ?",
+            (url, time.time() - self.ttl),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, url, department, doctor):
+        self.db.execute(
+            "INSERT OR REPLACE INTO profiles (url, department, doctor, fetched_at) VALUES (?, ?, ?, ?)",
+            (url, department, doctor, time.time()),
+        )
+        self.db.commit()
+
+    # ✅ 캐시 조회 → 없으면 fetch_fn(url) 코루틴으로 가져와 저장
+    # - fetch_fn은 (진료과, 의사 이름)을 반환, 둘 중 하나라도 "ERROR"면 저장하지 않음
+    async def get_or_fetch(self, url, fetch_fn):
+        cached = self.get(url)
+        if cached:
+            self.hits += 1
+            return cached
+        if url in self._inflight:
+            self.hits += 1
+            return await asyncio.shield(self._inflight[url])
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch_fn(url))
+        self._inflight[url] = task
+        try:
+            result = await task
+        finally:
+            del self._inflight[url]
+        if "ERROR" not in result:
+            self.put(url, *result)
+        return result
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,94 @@
+# 수집한 질문 색인 (실행 간 중복 수집 방지)
+# - 질문 키: 질문 URL의 docId (없으면 쿼리 순서를 정리한 URL)
+#   → 같은 질문이 날짜 범위가 겹치는 수집이나 끌올(재게시)로 다시 목록에 나와도 같은 키
+# - SQLite(정확한 집합) + 메모리 Bloom filter(빠른 부정 판정): 처음 보는 질문은 대부분 DB 조회 없이 판정
+# - 열 때 DB의 키로 Bloom filter를 다시 만들고, 이후 추가하는 키는 둘 다에 기록
+#
+# 사용 예:
+#   index = SeenIndex("./.cache/seen_questions.sqlite")
+#   if url not in index: ... index.add(url)
+
+import hashlib
+import math
+import os
+import sqlite3
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+SEEN_DB = "./.cache/seen_questions.sqlite"
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+
+def question_key(url):
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query)
+    for name, value in query:
+        if name == "docId":
+            return f"docId:{value}"
+    return f"url:{parts.netloc}{parts.path}?{urlencode(sorted(query))}"
+
+
+# ✅ Bloom filter (비트 배열 + 이중 해싱, k개의 위치가 모두 1이면 "있을 수 있음")
+class BloomFilter:
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenIndex:
+    def __init__(self, db_path=SEEN_DB, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, url TEXT NOT NULL)")
+        self.db.commit()
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (key,) in self.db.execute("SELECT key FROM seen"):
+            self.bloom.add(key)
+        self.db_lookups = 0
+
+    def __contains__(self, url):
+        key = question_key(url)
+        if key not in self.bloom:
+            return False
+        self.db_lookups += 1  # 🔸 Bloom filter가 "있을 수 있음"이라고 한 경우만 DB 확인
+        return self.db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def urls(self):
+        for (url,) in self.db.execute("SELECT url FROM seen"):
+            yield url
+
+    # ✅ 질문 URL 추가 → 새로 추가됐으면 True
+    def add(self, url):
+        return self.add_many([url]) == 1
+
+    # ✅ 여러 URL을 한 트랜잭션으로 추가 → 새로 추가된 수
+    def add_many(self, urls):
+        rows = {question_key(url): url for url in urls}
+        before = self.db.total_changes
+        self.db.executemany("INSERT OR IGNORE INTO seen (key, url) VALUES (?, ?)", rows.items())
+        self.db.commit()
+        for key in rows:
+            self.bloom.add(key)
+        return self.db.total_changes - before
+
+    def close(self):
+        self.db.close()
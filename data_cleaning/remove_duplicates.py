@@ -0,0 +1,64 @@
+import os
+
+from corpus.loader import DROP, rewrite_json_file
+from corpus.store import CorpusStore, is_store
+from crawler.seen_index import SEEN_DB, SeenIndex
+
+# ✅ 중복 제거할 디렉토리 경로 (순서대로 처리 → 앞 폴더에 있는 질문은 뒤 폴더에서 삭제, 예: 학습/평가 데이터 중복 제거)
+INPUT_DIRS = ["./train_data"]  # ← 예: ["./dataset/train_data", "./dataset/test_data"]
+# ✅ 남은 질문을 수집기 색인(crawler.seen_index)에도 등록 → 다음 수집에서 상세 페이지를 다시 요청하지 않음
+REGISTER_SEEN = True
+# 실행 (저장소 루트에서): python -m data_cleaning.remove_duplicates
+
+
+# ✅ 처음 나온 질문만 남기는 판정 함수 (질문 키는 docId 기준, question_url이 없는 문서는 유지)
+def make_keep(seen):
+    def keep(item):
+        url = item.get("question_url")
+        if not url:
+            return True
+        if url in seen:
+            return False
+        seen.add(url)
+        return True
+    return keep
+
+
+# ✅ 디렉토리 내 모든 JSON 파일 처리
+# - 문서를 하나씩 읽어 임시 파일에 바로 기록하고, 삭제된 문서가 있을 때만 원본과 교체
+def remove_duplicates_in_dir(input_dir, keep):
+    if is_store(input_dir):
+        # 🔸 샤드 저장소면 바뀐 샤드만 다시 씀
+        removed = CorpusStore(input_dir).filter(keep)
+        print(f"☑️ {input_dir}: 중복 {removed}건 삭제")
+        return
+
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith(".json"):
+            continue
+
+        try:
+            _, removed = rewrite_json_file(
+                os.path.join(input_dir, filename), lambda item: False if keep(item) else DROP
+            )
+        except ValueError:  # json.JSONDecodeError 포함
+            print(f"⚠️ JSON 디코딩 실패: {filename}")
+            continue
+
+        if removed:
+            print(f"✅ {filename}: 중복 {removed}건 삭제")
+        else:
+            print(f"☑️ 중복 없음: {filename}")
+
+
+if __name__ == "__main__":
+    # 🔸 이번 실행 안에서의 중복 판정은 메모리 색인 사용 (수집기 색인에는 이미 모든 질문이 있으므로)
+    seen = SeenIndex(":memory:")
+    keep = make_keep(seen)
+    for input_dir in INPUT_DIRS:
+        remove_duplicates_in_dir(input_dir, keep)
+
+    if REGISTER_SEEN:
+        index = SeenIndex(SEEN_DB)
+        added = index.add_many(seen.urls())
+        print(f"✅ 수집기 색인에 {added}건 등록 (총 {len(index)}건)")
@@ -1,42 +1,56 @@
 import os
-import json
+
+from corpus.loader import rewrite_json_file
+from corpus.store import CorpusStore, is_store
 
 # ✅ 수정할 디렉토리 경로 지정
 INPUT_DIR = "./train_data"  # ← 여기에 실제 경로 입력
+# 실행 (저장소 루트에서): python -m data_cleaning.remove_line_breaking
+
+# ✅ 줄바꿈 제거 함수 (예측 캐시의 문장 정규화에서도 동일하게 사용)
+def remove_line_breaks(text):
+    return text.replace("\n", " ")
+
+# ✅ 문서 하나의 제목/본문 줄바꿈 제거 → 변경 여부 반환
+def remove_line_breaks_in_record(item):
+    modified = False
+    if "title" in item:
+        new_title = remove_line_breaks(item["title"])
+        if new_title != item["title"]:
+            item["title"] = new_title
+            modified = True
+    if "content" in item:
+        new_content = remove_line_breaks(item["content"])
+        if new_content != item["content"]:
+            item["content"] = new_content
+            modified = True
+    return modified
 
 # ✅ 디렉토리 내 모든 JSON 파일 처리
-for filename in os.listdir(INPUT_DIR):
-    if not filename.endswith(".json"):
-        continue
-
-    file_path = os.path.join(INPUT_DIR, filename)
-    
-    # 🔸 파일 로딩
-    with open(file_path, "r", encoding="utf-8") as f:
+# - 문서를 하나씩 읽어 임시 파일에 바로 기록하고, 변경이 있을 때만 원본과 교체 (파일 전체를 메모리에 올리지 않음)
+def remove_line_breaks_in_dir(input_dir):
+    if is_store(input_dir):
+        # 🔸 샤드 저장소면 변경된 샤드만 다시 씀
+        changed = CorpusStore(input_dir).rewrite(remove_line_breaks_in_record)
+        for path in changed:
+            print(f"✅ 수정 완료: {path}")
+        print(f"☑️ 변경된 샤드 {len(changed)}개")
+        return
+
+    for filename in os.listdir(input_dir):
+        if not filename.endswith(".json"):
+            continue
+
+        # 🔸 파일 로딩 → 각 항목에서 줄바꿈 제거 → 임시 파일에 기록, 변경이 있을 때만 원본과 교체
         try:
-            data = json.load(f)
-        except json.JSONDecodeError:
+            modified, _ = rewrite_json_file(os.path.join(input_dir, filename), remove_line_breaks_in_record)
+        except ValueError:  # json.JSONDecodeError 포함
             print(f"⚠️ JSON 디코딩 실패: {filename}")
             continue
+        if modified:
+            print(f"✅ 수정 완료: {filename}")
+        else:
+            print(f"☑️ 변경 없음: {filename}")
 
-    # 🔸 각 항목에서 줄바꿈 제거
-    modified = False
-    for item in data:
-        if "title" in item:
-            new_title = item["title"].replace("\n", " ")
-            if new_title != item["title"]:
-                item["title"] = new_title
-                modified = True
-        if "content" in item:
-            new_content = item["content"].replace("\n", " ")
-            if new_content != item["content"]:
-                item["content"] = new_content
-                modified = True
-
-    # 🔸 변경이 있을 경우 덮어쓰기
-    if modified:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"✅ 수정 완료: {filename}")
-    else:
-        print(f"☑️ 변경 없음: {filename}")
+if __name__ == "__main__":
+    remove_line_breaks_in_dir(INPUT_DIR)
@@ -2,9 +2,11 @@
 # 오히려 띄어쓰기가 이상해지는 부분이 있어서 현재는 사용하지 않음
 
 import os
-import json
 from pykospacing import Spacing
 
+from corpus.loader import rewrite_json_file
+from corpus.store import CorpusStore, is_store
+
 # ✅ 띄어쓰기 보정기 초기화
 spacing = Spacing()
 
@@ -16,39 +18,44 @@ def correct_text(text):
         print(f"⚠️ 보정 실패: {e}")
         return text  # 실패 시 원문 유지
 
-# ✅ 디렉토리 내 모든 JSON 파일에 적용
+# ✅ 문서 하나의 제목/본문 띄어쓰기 보정 → 변경 여부 반환
+def correct_record(item):
+    modified = False
+    if "title" in item:
+        new_title = correct_text(item["title"])
+        if new_title != item["title"]:
+            item["title"] = new_title
+            modified = True
+
+    if "content" in item:
+        new_content = correct_text(item["content"])
+        if new_content != item["content"]:
+            item["content"] = new_content
+            modified = True
+    return modified
+
+# ✅ 디렉토리 내 모든 JSON 파일에 적용 (문서를 하나씩 읽어 임시 파일에 기록)
 def correct_json_files_in_dir(directory):
+    if is_store(directory):
+        # 🔸 샤드 저장소면 변경된 샤드만 다시 씀
+        changed = CorpusStore(directory).rewrite(correct_record)
+        for path in changed:
+            print(f"✅ 보정 및 저장 완료: {path}")
+        print(f"☑️ 변경된 샤드 {len(changed)}개")
+        return
+
     for filename in os.listdir(directory):
         if not filename.endswith(".json"):
             continue
 
-        path = os.path.join(directory, filename)
         print(f"📂 처리 중: {filename}")
-
-        with open(path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                print(f"❌ JSON 파싱 실패: {filename}")
-                continue
-
-        modified = False
-        for item in data:
-            if "title" in item:
-                new_title = correct_text(item["title"])
-                if new_title != item["title"]:
-                    item["title"] = new_title
-                    modified = True
-
-            if "content" in item:
-                new_content = correct_text(item["content"])
-                if new_content != item["content"]:
-                    item["content"] = new_content
-                    modified = True
-
+        # 🔸 성공하고 변경이 있을 때만 원본과 교체
+        try:
+            modified, _ = rewrite_json_file(os.path.join(directory, filename), correct_record)
+        except ValueError:  # json.JSONDecodeError 포함
+            print(f"❌ JSON 파싱 실패: {filename}")
+            continue
         if modified:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
             print(f"✅ 보정 및 저장 완료: {filename}")
         else:
             print(f"☑️ 변경 없음: {filename}")
@@ -8,9 +8,14 @@ Original file is located at
 """
 
 # 라이브러리 임포트
+import os
+import sys
 from transformers import AutoTokenizer, AutoModel
 import torch
-from sklearn.metrics.pairwise import cosine_similarity
+
+# 저장소 루트의 model.disease_index 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.disease_index import embed_texts, load_or_build
 
 # 1. KM-BERT 불러오기
 model_name = "madatnlp/km-bert"
@@ -24,39 +29,25 @@ bert_model.to(device)
 # 2. 질병 목록 준비
 disease_list = ["감기", "독감", "당뇨병", "고혈압", "지주막하출혈", "추간판탈출증", "알츠하이머", "에이즈", "코로나-19"]
 
-# 3. 질병명을 벡터화
-def get_sentence_embedding(sentence):
-    inputs = tokenizer(sentence, return_tensors="pt", truncation=True, padding=True)
-    inputs = {key: val.to(device) for key, val in inputs.items()}
-    with torch.no_grad():
-        outputs = bert_model(**inputs)
-        cls_embedding = outputs.last_hidden_state[:, 0, :]  # [CLS] 토큰
-    return cls_embedding.cpu()
-
-disease_embeddings = []
-for disease in disease_list:
-    emb = get_sentence_embedding(disease)
-    disease_embeddings.append(emb)
-
-# 병 이름 임베딩들을 하나의 텐서로 합치기
-disease_embeddings = torch.cat(disease_embeddings, dim=0)  # (5, hidden_size)
-
-# 4. 증상 문장을 입력받아 예측하는 함수
-def predict_disease(symptom_sentence):
-    symptom_emb = get_sentence_embedding(symptom_sentence)  # (1, hidden_size)
+# 3. 질병명 인덱스 불러오기
+# 저장된 인덱스가 있으면 메모리 매핑으로 바로 불러오고, 없거나 목록이 바뀌었으면 배치 임베딩 후 저장
+INDEX_DIR = "./disease_index"
+disease_index = load_or_build(disease_list, tokenizer, bert_model, INDEX_DIR, model_name)
 
-    # 코사인 유사도 계산
-    similarities = cosine_similarity(symptom_emb.numpy(), disease_embeddings.numpy())  # (1, 5)
+# 4. 증상 문장들을 한 번에 예측하는 함수
+def predict_diseases(symptom_sentences, top_k=3):
+    symptom_embs = embed_texts(symptom_sentences, tokenizer, bert_model)  # (문장 수, hidden_size)
+    return disease_index.search(symptom_embs, top_k=top_k)
 
-    # 유사도 하나씩 출력
-    print("\n[각 질병에 대한 유사도]")
-    for idx, disease in enumerate(disease_list):
-        print(f"{disease}: {similarities[0][idx]:.4f}")
+def predict_disease(symptom_sentence, top_k=3):
+    results = predict_diseases([symptom_sentence], top_k=top_k)[0]
 
-    best_idx = similarities.argmax()
-    predicted_disease = disease_list[best_idx]
-    confidence = similarities[0][best_idx]
+    # 상위 질병 유사도 출력
+    print(f"\n[상위 {len(results)}개 질병 유사도]")
+    for disease, score in results:
+        print(f"{disease}: {score:.4f}")
 
+    predicted_disease, confidence = results[0]
     return predicted_disease, confidence
 
 # 5. 테스트
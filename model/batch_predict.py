@@ -0,0 +1,129 @@
+# 진료과 예측 배치 스코어러 (명령행 도구)
+# - 입력: JSONL 또는 프로젝트 형식({title, content, ...}의 JSON 배열) 파일, 파일을 주지 않으면 stdin
+# - 출력: 입력 레코드에 "predictions"를 붙인 JSONL (stdout 또는 --output)
+# - chunk 단위로 읽고 예측하고 바로 내보내므로 메모리 사용량은 입력 크기와 무관
+# - torch와 모델은 첫 레코드가 들어온 시점에 불러오므로 --help / 인자 오류는 즉시 종료, 입력이 없으면 모델을 읽지 않음
+#
+# 실행 예 (저장소 루트에서):
+#   python -m model.batch_predict dataset/test_data/안과_test.json --model-dir ./trained_kmbert_model
+#   cat questions.jsonl | python -m model.batch_predict --top-k 5 > predictions.jsonl
+
+import argparse
+import json
+import os
+import sys
+from itertools import islice
+
+from corpus.loader import iter_json_records
+from model.defaults import BACKEND, BACKENDS, BATCH_SIZE, MAX_LENGTH, MODEL_DIR
+
+
+# ✅ 레코드 → 예측 입력 문장 ({"text": ...} 또는 {title, content}, 없는 필드는 빈 문자열)
+def input_text(record):
+    if isinstance(record, str):
+        return record
+    if "text" in record:
+        return record["text"]
+    return f"{record.get('title') or ''} {record.get('content') or ''}"
+
+
+def iter_inputs(paths):
+    if not paths:
+        yield from iter_json_records(sys.stdin)
+        return
+    for path in paths:
+        if path == "-":
+            yield from iter_json_records(sys.stdin)
+            continue
+        with open(path, encoding="utf-8") as f:
+            yield from iter_json_records(f)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ✅ 첫 chunk가 들어왔을 때만 모델을 불러오는 예측기 → (예측 함수, 캐스케이드 또는 None)
+def make_predictor(args):
+    from model import predict_specialty
+
+    predict_specialty.load_model(args.model_dir, args.backend)
+    predict = predict_specialty.predict_departments
+    namespace = f"{args.model_dir}:{args.backend}"
+    cascade = None
+    if args.cascade:
+        from model.cascade import CascadePredictor, load_first_stage
+
+        cascade = CascadePredictor(load_first_stage(args.cascade), args.cascade_threshold, predict)
+        predict = cascade.predict_departments
+        namespace += f":cascade={os.path.abspath(args.cascade)}@{args.cascade_threshold}"
+    if args.cache_db:
+        from model.prediction_cache import PredictionCache
+
+        cache = PredictionCache(db_path=args.cache_db, namespace=namespace, predict_fn=predict)
+        return cache.predict_departments, cascade
+    return predict, cascade
+
+
+def run(args, out):
+    predict = cascade = None
+    total = 0
+    for chunk in chunked(iter_inputs(args.inputs), args.chunk_size):
+        if predict is None:
+            predict, cascade = make_predictor(args)
+
+        results = predict(
+            [input_text(record) for record in chunk],
+            batch_size=args.batch_size,
+            top_k=args.top_k,
+            max_length=args.max_length,
+        )
+        for record, result in zip(chunk, results):
+            if not isinstance(record, dict):
+                record = {"text": record}
+            record["predictions"] = [
+                {"department": label, "probability": round(prob, 6)} for label, prob in result
+            ]
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        total += len(chunk)
+    if cascade is not None:
+        print(f"📊 캐스케이드: {cascade.summary()}", file=sys.stderr)
+    return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL/JSON 질문 파일의 진료과를 예측해 JSONL로 출력")
+    parser.add_argument("inputs", nargs="*", help="입력 파일 (생략하거나 '-'이면 stdin)")
+    parser.add_argument("-o", "--output", default=None, help="출력 파일 (기본: stdout)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--chunk-size", type=int, default=1024, help="한 번에 메모리에 올리는 레코드 수")
+    parser.add_argument("--cascade", default=None, metavar="FIRST_STAGE",
+                        help="캐스케이드 1단계 모델 파일 (model.cascade train 결과)")
+    parser.add_argument("--cascade-threshold", type=float, default=0.6,
+                        help="1단계 확신도가 이 값 이상이면 KM-BERT를 거치지 않음")
+    parser.add_argument("--cache-db", default=None, help="예측 결과 SQLite 캐시 파일 (선택)")
+    args = parser.parse_args(argv)
+    for name in ("top_k", "batch_size", "max_length", "chunk_size"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} 값은 1 이상이어야 합니다")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            count = run(args, out)
+    else:
+        count = run(args, sys.stdout)
+    print(f"✅ 예측 완료: {count}건", file=sys.stderr)
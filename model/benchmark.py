@@ -0,0 +1,160 @@
+# 진료과 예측 추론 벤치마크
+# - dataset/test_data 실제 질문으로 batch_size × max_length × 스레드 수 조합을 측정
+#   (torch: torch.set_num_threads / onnx: 스레드 수마다 intra_op_num_threads로 세션을 다시 생성)
+# - 조합마다 배치 지연시간 p50/p95/p99, 초당 처리 문서 수, 최대 RSS를 기록
+# - 결과는 JSON으로 저장해 실행/백엔드 간 비교에 사용
+#
+# 실행 (저장소 루트에서):
+#   python -m model.benchmark --model-dir ./trained_kmbert_model \
+#       --batch-sizes 1,8,32 --max-lengths 256,512 --threads 1,4 --limit 2000
+
+import argparse
+import json
+import os
+import platform
+import resource
+import time
+from datetime import datetime
+from itertools import product
+
+import numpy as np
+
+from corpus.loader import iter_examples
+from model import predict_specialty
+from model.cli_args import int_list
+
+TEST_DIR = "./dataset/test_data"
+RESULTS_DIR = "./benchmarks"
+
+
+# ✅ 최대 RSS 측정
+# - Linux에서는 /proc/self/clear_refs에 5를 써서 조합마다 최대값(VmHWM)을 초기화
+# - 초기화할 수 없는 환경에서는 프로세스 전체 최대값(ru_maxrss)을 사용
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if platform.system() == "Darwin" else usage / 1024
+
+
+# ✅ 추론 스레드 수 적용
+def set_threads(backend, model_dir, threads):
+    import torch
+
+    torch.set_num_threads(threads)
+    if backend != "torch":
+        from model.export_onnx import ONNX_FILES, OnnxSequenceClassifier
+
+        predict_specialty.model = OnnxSequenceClassifier(os.path.join(model_dir, ONNX_FILES[backend]), threads)
+
+
+def run_config(predict_departments, texts, batch_size, max_length, threads, warmup_batches=1):
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    for batch in batches[:warmup_batches]:
+        predict_departments(batch, batch_size=batch_size, top_k=3, max_length=max_length)
+
+    peak_reset = reset_peak_rss()
+    latencies = []
+    start = time.perf_counter()
+    for batch in batches:
+        t0 = time.perf_counter()
+        predict_departments(batch, batch_size=batch_size, top_k=3, max_length=max_length)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    return {
+        "batch_size": batch_size,
+        "max_length": max_length,
+        "threads": threads,
+        "documents": len(texts),
+        "batches": len(batches),
+        "latency_ms": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+            "mean": float(latencies.mean()),
+        },
+        "docs_per_second": len(texts) / elapsed if elapsed else float("inf"),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_scope": "config" if peak_reset else "process",
+    }
+
+
+def environment(args):
+    import torch
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "backend": args.backend,
+        "model_dir": os.path.abspath(args.model_dir),
+        "test_dir": args.test_dir,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="진료과 예측 추론 벤치마크")
+    parser.add_argument("--model-dir", default="./trained_kmbert_model")
+    parser.add_argument("--backend", choices=predict_specialty.BACKENDS, default=predict_specialty.BACKEND)
+    parser.add_argument("--test-dir", default=TEST_DIR)
+    parser.add_argument("--batch-sizes", type=int_list, default=[1, 8, 32])
+    parser.add_argument("--max-lengths", type=int_list, default=[256, 512])
+    parser.add_argument("--threads", type=int_list, default=[os.cpu_count()])
+    parser.add_argument("--limit", type=int, default=None, help="측정에 사용할 최대 문서 수")
+    parser.add_argument("--seed", type=int, default=42, help="--limit 사용 시 문서 샘플링 시드")
+    parser.add_argument("--output", default=None, help=f"결과 JSON 경로 (기본: {RESULTS_DIR}/<시각>_<백엔드>.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    texts = [text for text, _ in iter_examples(args.test_dir)]
+    if args.limit and args.limit < len(texts):
+        rng = np.random.default_rng(args.seed)
+        texts = [texts[i] for i in sorted(rng.choice(len(texts), args.limit, replace=False))]
+    print(f"📂 측정 문서 수: {len(texts)}건 ({args.test_dir})")
+
+    start = time.perf_counter()
+    predict_specialty.load_model(args.model_dir, args.backend)
+    load_seconds = time.perf_counter() - start
+    print(f"✅ 모델 로딩: {load_seconds:.2f}s ({args.backend})")
+
+    results = []
+    print(f"\n{'batch':>5} {'max_len':>7} {'threads':>7} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'docs/s':>8} {'RSS(MB)':>8}")
+    for threads, batch_size, max_length in product(args.threads, args.batch_sizes, args.max_lengths):
+        if not results or results[-1]["threads"] != threads:
+            set_threads(args.backend, args.model_dir, threads)
+        r = run_config(predict_specialty.predict_departments, texts, batch_size, max_length, threads)
+        results.append(r)
+        lat = r["latency_ms"]
+        print(f"{batch_size:>5} {max_length:>7} {threads:>7} {lat['p50']:>9.1f} {lat['p95']:>9.1f} "
+              f"{lat['p99']:>9.1f} {r['docs_per_second']:>8.1f} {r['peak_rss_mb']:>8.0f}")
+
+    report = {"environment": environment(args), "model_load_seconds": load_seconds, "results": results}
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{args.backend}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 결과 저장: {output}")
@@ -0,0 +1,172 @@
+# 단일 파일 모델 번들 (.safetensors)
+# - 가중치: safetensors 텐서 영역
+# - 라벨 순서 / 모델 config / 토크나이저(tokenizer.json) / 학습 메타데이터: safetensors 헤더의 __metadata__
+# - 불러올 때 파일을 mmap 하고 텐서를 복사 없이 그 위에 올리므로 콜드 스타트가 가중치 크기와 거의 무관
+# - 라벨 순서가 가중치와 같은 파일에 들어 있어 학습 / 서빙 간 라벨 순서가 어긋날 수 없음
+#
+# 기존 모델 폴더(trained_kmbert_model) 변환 (저장소 루트에서):
+#   python -m model.bundle convert --model-dir ./trained_kmbert_model --output ./kmbert_bundle.safetensors
+
+import argparse
+import json
+import mmap
+import struct
+from contextlib import nullcontext
+from datetime import datetime
+
+BUNDLE_FORMAT = "carepick-kmbert-bundle"
+BUNDLE_VERSION = "1"
+BUNDLE_SUFFIX = ".safetensors"
+
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def is_bundle(path):
+    return str(path).endswith(BUNDLE_SUFFIX)
+
+
+# ✅ 번들 저장
+def save_bundle(path, model, tokenizer, label_classes, metadata=None):
+    from safetensors.torch import save_model
+
+    label_classes = list(label_classes)
+    if model.config.num_labels != len(label_classes):
+        raise ValueError(f"라벨 수 불일치: 모델 {model.config.num_labels}개, 라벨 {len(label_classes)}개")
+    if not getattr(tokenizer, "is_fast", False):
+        raise ValueError("단일 파일 번들은 fast 토크나이저(tokenizer.json)만 지원합니다")
+
+    model.config.id2label = dict(enumerate(label_classes))
+    model.config.label2id = {label: i for i, label in enumerate(label_classes)}
+
+    tokenizer_config = dict(tokenizer.special_tokens_map)
+    tokenizer_config["model_max_length"] = tokenizer.model_max_length
+    tokenizer_config["padding_side"] = tokenizer.padding_side
+    tokenizer_config["model_input_names"] = list(tokenizer.model_input_names)
+
+    header = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "labels": json.dumps(label_classes, ensure_ascii=False),
+        "config": model.config.to_json_string(use_diff=False),
+        "tokenizer": tokenizer.backend_tokenizer.to_str(),
+        "tokenizer_config": json.dumps(tokenizer_config, ensure_ascii=False),
+        "training": json.dumps(
+            {"created_at": datetime.now().isoformat(timespec="seconds"), **(metadata or {})},
+            ensure_ascii=False,
+        ),
+    }
+    save_model(model, path, metadata=header)
+    return path
+
+
+# ✅ 헤더만 읽기 (가중치는 읽지 않음)
+def read_header(path):
+    with open(path, "rb") as f:
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    metadata = header.pop("__metadata__", {}) or {}
+    if metadata.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"모델 번들 형식이 아닙니다: {path}")
+    return header, metadata, 8 + size
+
+
+def read_metadata(path):
+    _, metadata, _ = read_header(path)
+    return {
+        "labels": json.loads(metadata["labels"]),
+        "training": json.loads(metadata.get("training", "{}")),
+    }
+
+
+# ✅ mmap 위에 텐서를 바로 생성 (copy-on-write 매핑이라 파일은 변경되지 않음)
+def _mmap_state_dict(path):
+    import torch
+
+    tensors_info, metadata, data_start = read_header(path)
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    state_dict = {}
+    for name, info in tensors_info.items():
+        dtype = getattr(torch, _DTYPES[info["dtype"]])
+        begin, end = info["data_offsets"]
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin)
+        state_dict[name] = tensor.view(info["shape"])
+    return state_dict, metadata, buffer
+
+
+def _tokenizer_from_metadata(metadata):
+    from tokenizers import Tokenizer
+    from transformers import PreTrainedTokenizerFast
+
+    return PreTrainedTokenizerFast(
+        tokenizer_object=Tokenizer.from_str(metadata["tokenizer"]),
+        **json.loads(metadata["tokenizer_config"]),
+    )
+
+
+# ✅ 번들 불러오기 → (tokenizer, model, label_classes, training_metadata)
+def load_bundle(path):
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = nullcontext
+
+    state_dict, metadata, buffer = _mmap_state_dict(path)
+    labels = json.loads(metadata["labels"])
+    config_dict = json.loads(metadata["config"])
+    config = AutoConfig.for_model(**config_dict)
+    if config.num_labels != len(labels):
+        raise ValueError(f"번들 라벨 수 불일치: config {config.num_labels}개, 라벨 {len(labels)}개")
+
+    # 🔸 가중치 초기화를 건너뛰고 mmap 텐서를 그대로 파라미터로 사용
+    with no_init_weights():
+        model = AutoModelForSequenceClassification.from_config(config)
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    if missing or unexpected:
+        raise ValueError(f"번들 가중치 불일치: 누락 {missing}, 불필요 {unexpected}")
+    model._bundle_mmap = buffer  # 텐서가 참조하는 매핑을 모델 수명 동안 유지
+    model.eval()
+
+    tokenizer = _tokenizer_from_metadata(metadata)
+    return tokenizer, model, labels, json.loads(metadata.get("training", "{}"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KM-BERT 단일 파일 모델 번들")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="기존 모델 폴더를 번들로 변환")
+    convert.add_argument("--model-dir", required=True)
+    convert.add_argument("--output", required=True)
+    convert.add_argument("--labels", default=None,
+                         help="라벨 목록 JSON 파일 (기본: 모델 config의 id2label, 없으면 predict_specialty.label_classes)")
+
+    info = sub.add_parser("info", help="번들 라벨 / 학습 메타데이터 출력")
+    info.add_argument("path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "info":
+        print(json.dumps(read_metadata(args.path), ensure_ascii=False, indent=2))
+    else:
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        from model import predict_specialty
+
+        tokenizer = AutoTokenizer.from_pretrained(args.model_dir)
+        model = AutoModelForSequenceClassification.from_pretrained(args.model_dir)
+        if args.labels:
+            with open(args.labels, encoding="utf-8") as f:
+                labels = json.load(f)
+        else:
+            labels = predict_specialty._config_labels(model.config) or predict_specialty.label_classes
+        save_bundle(args.output, model, tokenizer, labels, {"converted_from": args.model_dir})
+        print(f"✅ 번들 저장 완료: {args.output}")
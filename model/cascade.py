@@ -0,0 +1,184 @@
+# 2단계 캐스케이드 예측
+# - 1단계: 문자 n-gram TF-IDF + 선형 분류기(SGD, log loss) (load_data 결과로 학습, CPU에서 수 ms)
+# - 1단계 확신도(최고 확률)가 threshold 이상이면 그대로 답하고, 나머지만 KM-BERT로 넘김
+#
+# 실행 (저장소 루트에서):
+#   python -m model.cascade train --train-dir ./dataset/train_data
+#   python -m model.cascade evaluate --test-dir ./dataset/test_data --thresholds 0.6,0.7,0.8,0.9
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from corpus.loader import load_data
+from model.defaults import BACKEND, BACKENDS
+
+FIRST_STAGE_PATH = "./trained_kmbert_model/first_stage.joblib"
+TRAIN_DIR = "./dataset/train_data"
+TEST_DIR = "./dataset/test_data"
+DEFAULT_THRESHOLD = 0.6
+
+
+# ✅ 1단계 모델 학습
+def train_first_stage(train_dir, output_path=FIRST_STAGE_PATH):
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+
+    train_df = load_data(train_dir)
+    pipeline = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), min_df=2, sublinear_tf=True, max_features=300000),
+        SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=20, tol=None, random_state=42),
+    )
+    start = time.perf_counter()
+    pipeline.fit(train_df["text"], train_df["label"].str.strip())
+    print(f"✅ 1단계 모델 학습 완료: {len(train_df)}건, {time.perf_counter() - start:.1f}s")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    joblib.dump(pipeline, output_path)
+    print(f"✅ 저장 완료: {output_path}")
+    return pipeline
+
+
+def load_first_stage(path=FIRST_STAGE_PATH):
+    import joblib
+
+    return joblib.load(path)
+
+
+# ✅ 1단계 확률 → [(진료과, 확률), ...] 형식 변환 (predict_departments와 같은 형식)
+def _top_k(probs, classes, top_k):
+    top_k = min(top_k, len(classes))
+    indices = np.argsort(-probs, axis=1)[:, :top_k]
+    return [
+        [(classes[j], float(probs[i, j])) for j in row]
+        for i, row in enumerate(indices)
+    ]
+
+
+class CascadePredictor:
+    def __init__(self, first_stage, threshold=DEFAULT_THRESHOLD, second_stage=None):
+        self.first_stage = first_stage
+        self.classes = list(first_stage.classes_)
+        self.threshold = threshold
+        if second_stage is None:
+            from model import predict_specialty
+
+            second_stage = predict_specialty.predict_departments
+        self.second_stage = second_stage
+        self.answered = 0
+        self.escalated = 0
+        self.first_seconds = 0.0
+        self.second_seconds = 0.0
+
+    # ✅ predict_specialty.predict_departments와 같은 인터페이스
+    def predict_departments(self, texts, batch_size=32, top_k=3, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return []
+        start = time.perf_counter()
+        probs = self.first_stage.predict_proba(texts)
+        results = _top_k(probs, self.classes, top_k)
+        escalate = np.flatnonzero(probs.max(axis=1) < self.threshold)
+        self.first_seconds += time.perf_counter() - start
+
+        self.answered += len(texts) - len(escalate)
+        self.escalated += len(escalate)
+        if len(escalate):
+            start = time.perf_counter()
+            second = self.second_stage([texts[i] for i in escalate], batch_size=batch_size, top_k=top_k, **kwargs)
+            self.second_seconds += time.perf_counter() - start
+            for i, result in zip(escalate, second):
+                results[i] = result
+        return results
+
+    def escalation_rate(self):
+        total = self.answered + self.escalated
+        return self.escalated / total if total else 0.0
+
+    def summary(self):
+        return (f"KM-BERT 위임 {self.escalated}/{self.answered + self.escalated}건 ({self.escalation_rate():.2%}), "
+                f"1단계 {self.first_seconds:.2f}s / 2단계 {self.second_seconds:.2f}s")
+
+
+# ✅ 평가: 임계값별 위임 비율 / 정확도 / 절감 시간
+# - KM-BERT 단독 실행 시간과 임계값마다 캐스케이드를 실제로 실행한 시간(1단계 + 위임된 문서의 2단계)을 측정해 비교
+def evaluate(first_stage, test_dir, thresholds, batch_size=32):
+    from model import predict_specialty
+
+    test_df = load_data(test_dir)
+    texts = test_df["text"].tolist()
+    labels = np.array(test_df["label"].str.strip())
+    print(f"📂 평가 문서 수: {len(texts)}건 ({test_dir})")
+
+    start = time.perf_counter()
+    first_pred = np.array(first_stage.classes_)[first_stage.predict_proba(texts).argmax(axis=1)]
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bert_results = predict_specialty.predict_departments(texts, batch_size=batch_size, top_k=1)
+    bert_time = time.perf_counter() - start
+    bert_pred = np.array([result[0][0] for result in bert_results])
+    bert_acc = float((bert_pred == labels).mean())
+
+    print(f"\n1단계 단독 정확도: {(first_pred == labels).mean():.4f} ({first_time:.2f}s)")
+    print(f"KM-BERT 단독 정확도: {bert_acc:.4f} ({bert_time:.2f}s, {len(texts) / bert_time:.1f} docs/s)")
+    print(f"\n{'threshold':>9} {'위임비율':>8} {'정확도':>8} {'Δ정확도':>8} {'1단계':>7} {'2단계':>8} {'전체':>8} {'절감':>7}")
+
+    report = []
+    for threshold in thresholds:
+        cascade = CascadePredictor(first_stage, threshold, predict_specialty.predict_departments)
+        start = time.perf_counter()
+        results = cascade.predict_departments(texts, batch_size=batch_size, top_k=1)
+        cascade_time = time.perf_counter() - start
+        pred = np.array([result[0][0] for result in results])
+        rate = cascade.escalation_rate()
+        acc = float((pred == labels).mean())
+        saved = 1 - cascade_time / bert_time if bert_time else 0.0
+        report.append({
+            "threshold": threshold,
+            "escalation_rate": rate,
+            "accuracy": acc,
+            "bert_accuracy": bert_acc,
+            "first_stage_seconds": cascade.first_seconds,
+            "second_stage_seconds": cascade.second_seconds,
+            "cascade_seconds": cascade_time,
+            "bert_seconds": bert_time,
+            "latency_saved": saved,
+        })
+        print(f"{threshold:>9.2f} {rate:>8.2%} {acc:>8.4f} {acc - bert_acc:>+8.4f} {cascade.first_seconds:>6.2f}s "
+              f"{cascade.second_seconds:>7.2f}s {cascade_time:>7.2f}s {saved:>7.1%}")
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TF-IDF 1단계 + KM-BERT 2단계 캐스케이드")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train = sub.add_parser("train", help="1단계 모델 학습")
+    train.add_argument("--train-dir", default=TRAIN_DIR)
+    train.add_argument("--output", default=FIRST_STAGE_PATH)
+
+    ev = sub.add_parser("evaluate", help="임계값별 위임 비율 / 정확도 / 절감 시간 보고")
+    ev.add_argument("--test-dir", default=TEST_DIR)
+    ev.add_argument("--first-stage", default=FIRST_STAGE_PATH)
+    ev.add_argument("--model-dir", default=None, help="KM-BERT 모델 경로 (기본: predict_specialty.MODEL_DIR)")
+    ev.add_argument("--backend", choices=BACKENDS, default=BACKEND)
+    ev.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9,0.95")
+    ev.add_argument("--batch-size", type=int, default=32)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "train":
+        train_first_stage(args.train_dir, args.output)
+    else:
+        from model import predict_specialty
+
+        predict_specialty.load_model(args.model_dir or predict_specialty.MODEL_DIR, args.backend)
+        thresholds = [float(t) for t in args.thresholds.split(",")]
+        evaluate(load_first_stage(args.first_stage), args.test_dir, thresholds, args.batch_size)
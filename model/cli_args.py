@@ -0,0 +1,10 @@
+# 명령행 인자 파서 공용 함수 (torch 없이 import 가능)
+# - 쉼표로 구분한 값 목록: --batch-sizes 1,8,32 → [1, 8, 32]
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def float_list(value):
+    return [float(v) for v in value.split(",") if v]
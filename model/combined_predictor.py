@@ -0,0 +1,102 @@
+# 진료과 + 질병 동시 예측
+# - 파인튜닝된 분류 모델의 인코더를 배치당 한 번만 실행
+# - 같은 forward 결과에서 분류 헤드 logits → 진료과, [CLS] 임베딩 → 질병 인덱스 검색
+# - 질병 인덱스도 같은 인코더로 만들어야 하므로 모델 경로 + 가중치 파일 지문(크기 / 수정 시각)을 인코더 이름으로 기록
+#   → 같은 폴더에 모델을 다시 학습하면 인덱스를 다시 만듦, 인덱스는 기본적으로 모델 옆에 모델별로 저장
+#
+# 실행 (저장소 루트에서):
+#   python -m model.combined_predictor --model-dir ./trained_kmbert_model --diseases diseases.txt \
+#       "요즘 정신이 흐릿한데 피곤한 걸까요? 뇌가 문제일까요?"
+
+import argparse
+import glob
+import hashlib
+import os
+
+import numpy as np
+import torch
+
+from model import predict_specialty
+from model.disease_index import load_or_build, read_names
+
+INDEX_SUBDIR = "disease_index"
+WEIGHT_PATTERNS = ("model.safetensors", "model-*.safetensors", "pytorch_model.bin", "pytorch_model-*.bin")
+
+
+# ✅ 모델별 질병 인덱스 경로 (모델 폴더 안, 단일 파일 번들이면 번들 옆 <이름>_disease_index)
+def default_index_dir(model_dir):
+    if os.path.isdir(model_dir):
+        return os.path.join(model_dir, INDEX_SUBDIR)
+    return f"{os.path.splitext(model_dir)[0]}_{INDEX_SUBDIR}"
+
+
+# ✅ 가중치 파일 지문 (파일 이름 / 크기 / 수정 시각의 sha256 앞 16자리, 파일을 읽지 않으므로 즉시 계산)
+def weights_fingerprint(model_dir):
+    if os.path.isdir(model_dir):
+        paths = sorted({p for pattern in WEIGHT_PATTERNS for p in glob.glob(os.path.join(model_dir, pattern))})
+    else:
+        paths = [model_dir]  # 단일 파일 번들
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CombinedPredictor:
+    def __init__(self, disease_names, model_dir=predict_specialty.MODEL_DIR, index_dir=None):
+        if predict_specialty.is_loaded() and not isinstance(predict_specialty.model, torch.nn.Module):
+            raise ValueError("진료과 + 질병 동시 예측은 torch 백엔드에서만 지원합니다")
+        self.tokenizer, self.model = predict_specialty.load_model(model_dir, "torch")
+        self.disease_index = load_or_build(
+            disease_names,
+            self.tokenizer,
+            self.model.base_model,
+            index_dir or default_index_dir(model_dir),
+            encoder_name=f"{os.path.abspath(model_dir)}@{weights_fingerprint(model_dir)}",
+        )
+
+    # ✅ 배치 예측
+    # - 입력 순서대로 {"departments": [(진료과, 확률), ...], "diseases": [(질병명, 유사도), ...]}
+    def predict(self, texts, batch_size=predict_specialty.BATCH_SIZE, top_k=3, top_k_diseases=3,
+                max_length=predict_specialty.MAX_LENGTH):
+        texts = list(texts)
+        if not texts:
+            return []
+
+        departments = [None] * len(texts)
+        embeddings = np.empty((len(texts), self.model.config.hidden_size), dtype=np.float32)
+        with torch.inference_mode():
+            batches = predict_specialty.length_sorted_batches(self.tokenizer, texts, batch_size, max_length)
+            for batch_idx, inputs in batches:
+                outputs = self.model(**inputs, output_hidden_states=True)
+                embeddings[batch_idx] = outputs.hidden_states[-1][:, 0, :].float().numpy()  # [CLS] 토큰
+                for i, result in zip(batch_idx, predict_specialty.top_k_departments(outputs.logits, top_k)):
+                    departments[i] = result
+
+        diseases = self.disease_index.search(embeddings, top_k_diseases)
+        return [
+            {"departments": dept, "diseases": disease}
+            for dept, disease in zip(departments, diseases)
+        ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="진료과 + 질병 동시 예측 (인코더 1회 실행)")
+    parser.add_argument("sentences", nargs="+")
+    parser.add_argument("--model-dir", default=predict_specialty.MODEL_DIR)
+    parser.add_argument("--diseases", required=True, help="질병명 목록 파일 (한 줄에 하나)")
+    parser.add_argument("--index-dir", default=None, help=f"기본: 모델 폴더 안의 {INDEX_SUBDIR}")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--top-k-diseases", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    predictor = CombinedPredictor(read_names(args.diseases), args.model_dir, args.index_dir)
+    for sentence, result in zip(args.sentences, predictor.predict(args.sentences, top_k=args.top_k,
+                                                                  top_k_diseases=args.top_k_diseases)):
+        print(f"\n📨 입력 문장: {sentence}")
+        print("🔮 진료과: " + ", ".join(f"{label}({prob*100:.1f}%)" for label, prob in result["departments"]))
+        print("🩺 질병: " + ", ".join(f"{name}({score:.3f})" for name, score in result["diseases"]))
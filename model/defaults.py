@@ -0,0 +1,15 @@
+# 예측 관련 기본값 (torch / transformers 없이 import 가능)
+# - model.predict_specialty와 명령행 도구(batch_predict, cascade 등)가 함께 사용
+# - 명령행 도구는 이 모듈만 top level에서 import하므로 --help / 인자 오류는 torch 로딩 없이 바로 종료
+
+# ✅ 모델 경로 설정 (Google Drive 기준)
+MODEL_DIR = "/content/drive/MyDrive/kmbert_saved_model"
+
+MAX_LENGTH = 512
+BATCH_SIZE = 32
+
+# ✅ 추론 백엔드
+# - torch: transformers 모델 그대로 사용
+# - onnx / onnx-int8: model.export_onnx로 내보낸 ONNX Runtime 모델 (CPU 전용 서버용)
+BACKENDS = ("torch", "onnx", "onnx-int8")
+BACKEND = "torch"
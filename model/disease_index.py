@@ -0,0 +1,187 @@
+# 질병명 임베딩 인덱스
+# - 질병명 목록을 배치 단위로 한 번만 임베딩 ([CLS] 벡터)
+# - L2 정규화된 float32 행렬을 .npy로 저장하고, 불러올 때는 메모리 매핑 (시작 시간이 목록 크기와 무관)
+# - 검색은 여러 증상 문장을 한 번에 행렬곱으로 처리 (정규화된 벡터의 내적 = 코사인 유사도)
+#
+# 실행 (저장소 루트에서):
+#   python -m model.disease_index build --names diseases.txt --output ./disease_index
+#   python -m model.disease_index query --index ./disease_index "최근에 무언가를 깜빡하는 경우가 많아졌어요"
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+MODEL_NAME = "madatnlp/km-bert"
+INDEX_DIR = "./disease_index"
+EMBEDDINGS_FILE = "embeddings.npy"
+META_FILE = "index.json"
+
+
+# ✅ 문장 목록을 배치 단위로 임베딩 (길이순 정렬 + 배치별 동적 패딩)
+# - encoder는 AutoModel 또는 분류 모델의 base_model 등 last_hidden_state를 내는 모델
+# - pooling: "cls"([CLS] 토큰) 또는 "mean"(패딩을 제외한 토큰 평균)
+# - max_length 기본값은 분류 모델과 같은 predict_specialty.MAX_LENGTH
+def embed_texts(texts, tokenizer, encoder, batch_size=64, max_length=None, pooling="cls"):
+    import torch
+    from model.predict_specialty import MAX_LENGTH, length_sorted_batches
+
+    max_length = max_length or MAX_LENGTH
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, encoder.config.hidden_size), dtype=np.float32)
+
+    device = next(encoder.parameters()).device
+    embeddings = np.empty((len(texts), encoder.config.hidden_size), dtype=np.float32)
+
+    with torch.inference_mode():
+        for batch_idx, inputs in length_sorted_batches(tokenizer, texts, batch_size, max_length):
+            inputs = {key: val.to(device) for key, val in inputs.items()}
+            hidden = encoder(**inputs).last_hidden_state
+            if pooling == "mean":
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            else:
+                pooled = hidden[:, 0, :]  # [CLS] 토큰
+            embeddings[batch_idx] = pooled.float().cpu().numpy()
+    return embeddings
+
+
+def l2_normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def names_digest(names):
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def read_names(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class DiseaseIndex:
+    def __init__(self, names, embeddings, metadata=None):
+        self.names = list(names)
+        self.embeddings = embeddings  # (질병 수, hidden_size) L2 정규화된 float32
+        self.metadata = metadata or {}
+
+    @classmethod
+    def build(cls, names, tokenizer, encoder, batch_size=64, encoder_name=MODEL_NAME, max_length=None):
+        from model.predict_specialty import MAX_LENGTH
+
+        max_length = max_length or MAX_LENGTH
+        names = list(dict.fromkeys(names))  # 순서를 유지하며 중복 제거
+        embeddings = l2_normalize(embed_texts(names, tokenizer, encoder, batch_size, max_length))
+        metadata = {
+            "encoder": encoder_name,
+            "pooling": "cls",
+            "max_length": max_length,
+            "dim": int(embeddings.shape[1]),
+            "count": len(names),
+            "names_sha256": names_digest(names),
+        }
+        return cls(names, embeddings, metadata)
+
+    def save(self, index_dir=INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, EMBEDDINGS_FILE), np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"metadata": self.metadata, "names": self.names}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, mmap=True):
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r" if mmap else None)
+        return cls(meta["names"], embeddings, meta["metadata"])
+
+    # ✅ 저장된 인덱스가 주어진 질병 목록 / 인코더 / max_length로 만들어진 것인지 확인
+    def matches(self, names, encoder_name, max_length=None):
+        from model.predict_specialty import MAX_LENGTH
+
+        return (
+            self.metadata.get("encoder") == encoder_name
+            and self.metadata.get("max_length") == (max_length or MAX_LENGTH)
+            and self.metadata.get("names_sha256") == names_digest(list(dict.fromkeys(names)))
+        )
+
+    # ✅ 벡터화된 top-k 검색
+    # - query_embeddings: (질의 수, hidden_size) → 질의마다 [(질병명, 코사인 유사도), ...]
+    def search(self, query_embeddings, top_k=1):
+        queries = l2_normalize(np.atleast_2d(query_embeddings))
+        scores = queries @ self.embeddings.T  # (질의 수, 질병 수)
+        top_k = min(top_k, scores.shape[1])
+        if top_k < scores.shape[1]:
+            candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        top_indices = np.take_along_axis(candidates, order, axis=1)
+        top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        return [
+            [(self.names[j], float(s)) for j, s in zip(idx_row, score_row)]
+            for idx_row, score_row in zip(top_indices, top_scores)
+        ]
+
+
+# ✅ 인덱스 불러오기 (없거나 목록/인코더/max_length가 바뀌었으면 새로 만들어 저장)
+def load_or_build(names, tokenizer, encoder, index_dir=INDEX_DIR, encoder_name=MODEL_NAME, batch_size=64,
+                  max_length=None):
+    if os.path.exists(os.path.join(index_dir, META_FILE)):
+        index = DiseaseIndex.load(index_dir)
+        if index.matches(names, encoder_name, max_length):
+            return index
+        print("⚠️ 질병 목록 / 인코더 / max_length가 변경되어 인덱스를 다시 만듭니다")
+    index = DiseaseIndex.build(names, tokenizer, encoder, batch_size, encoder_name, max_length)
+    index.save(index_dir)
+    print(f"✅ 질병 인덱스 저장: {index_dir} ({len(index.names)}개)")
+    return index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="질병명 임베딩 인덱스")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="질병명 목록(한 줄에 하나)으로 인덱스 생성")
+    build.add_argument("--names", required=True)
+    build.add_argument("--output", default=INDEX_DIR)
+    build.add_argument("--model", default=MODEL_NAME)
+    build.add_argument("--batch-size", type=int, default=64)
+    build.add_argument("--max-length", type=int, default=None, help="기본: predict_specialty.MAX_LENGTH")
+
+    query = sub.add_parser("query", help="증상 문장으로 질병 검색")
+    query.add_argument("sentences", nargs="+")
+    query.add_argument("--index", default=INDEX_DIR)
+    query.add_argument("--top-k", type=int, default=5)
+    query.add_argument("--max-length", type=int, default=None, help="기본: 인덱스를 만들 때의 max_length")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    from transformers import AutoTokenizer, AutoModel
+
+    if args.command == "build":
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+        encoder = AutoModel.from_pretrained(args.model).eval()
+        index = DiseaseIndex.build(read_names(args.names), tokenizer, encoder, args.batch_size, args.model,
+                                   args.max_length)
+        index.save(args.output)
+        print(f"✅ 질병 인덱스 저장: {args.output} ({len(index.names)}개, dim={index.metadata['dim']})")
+    else:
+        index = DiseaseIndex.load(args.index)
+        encoder_name = index.metadata["encoder"]
+        tokenizer = AutoTokenizer.from_pretrained(encoder_name)
+        encoder = AutoModel.from_pretrained(encoder_name).eval()
+        max_length = args.max_length or index.metadata.get("max_length")
+        results = index.search(embed_texts(args.sentences, tokenizer, encoder, max_length=max_length), args.top_k)
+        for sentence, result in zip(args.sentences, results):
+            print(f"\n📨 {sentence}")
+            for rank, (name, score) in enumerate(result, 1):
+                print(f"{rank}. {name:<12} — 유사도: {score:.4f}")
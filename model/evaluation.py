@@ -0,0 +1,101 @@
+# 평가 지표 계산 및 평가 결과 파일(JSON) 저장
+# - 추론 결과(logits) 한 번으로 정확도 / macro-F1 / 진료과별 precision·recall·F1·top-k / top-k 정확도 / 혼동 행렬을 모두 계산
+# - 모델 버전마다 eval_artifacts/<버전>.json 으로 저장 → visualize_result.py가 여러 버전을 비교해 그림으로 출력
+# - numpy / scikit-learn만 사용 (torch 불필요)
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+ARTIFACT_FORMAT = "carepick-eval"
+ARTIFACT_VERSION = 1
+ARTIFACT_DIR = "./eval_artifacts"
+TOP_K = (1, 3, 5)
+
+
+# ✅ 정답이 상위 k개 안에 있는지 (문서별 bool)
+def top_k_hits(logits, labels, k):
+    k = min(k, logits.shape[1])
+    top = np.argpartition(-logits, k - 1, axis=1)[:, :k]
+    return (top == np.asarray(labels)[:, None]).any(axis=1)
+
+
+# ✅ Trainer.compute_metrics용 요약 지표
+def summary_metrics(logits, labels):
+    from sklearn.metrics import accuracy_score, f1_score
+
+    logits = np.asarray(logits)
+    labels = np.asarray(labels)
+    preds = logits.argmax(axis=1)
+    return {
+        "accuracy": accuracy_score(labels, preds),
+        "f1_macro": f1_score(labels, preds, average="macro"),
+        "top3_accuracy": float(top_k_hits(logits, labels, 3).mean()),
+    }
+
+
+# ✅ 전체 평가 보고서
+def evaluation_report(logits, labels, label_classes, top_k=TOP_K):
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+
+    logits = np.asarray(logits)
+    labels = np.asarray(labels)
+    preds = logits.argmax(axis=1)
+    class_ids = np.arange(len(label_classes))
+
+    precision, recall, f1, support = precision_recall_fscore_support(
+        labels, preds, labels=class_ids, zero_division=0
+    )
+    hits = {k: top_k_hits(logits, labels, k) for k in top_k}
+
+    per_class = {}
+    for i, label in enumerate(label_classes):
+        mask = labels == i
+        per_class[label] = {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1": float(f1[i]),
+            "support": int(support[i]),
+            **{f"top{k}_accuracy": float(hits[k][mask].mean()) if mask.any() else 0.0 for k in top_k},
+        }
+
+    # 정답 또는 예측에 한 번이라도 나온 진료과만 macro 평균에 포함 (sklearn f1_score 기본 동작과 동일)
+    present = np.isin(class_ids, np.union1d(labels, preds))
+    return {
+        "documents": int(len(labels)),
+        "accuracy": float((preds == labels).mean()),
+        "f1_macro": float(f1[present].mean()) if present.any() else 0.0,
+        "top_k_accuracy": {str(k): float(hits[k].mean()) for k in top_k},
+        "per_class": per_class,
+        "labels": list(label_classes),
+        "confusion_matrix": confusion_matrix(labels, preds, labels=class_ids).tolist(),
+    }
+
+
+def save_artifact(report, model_version, metadata=None, artifact_dir=ARTIFACT_DIR, path=None):
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "model_version": model_version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "metadata": metadata or {},
+        **report,
+    }
+    path = path or os.path.join(artifact_dir, f"{model_version}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_artifact(path):
+    with open(path, encoding="utf-8") as f:
+        artifact = json.load(f)
+    if artifact.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"평가 결과 파일 형식이 아닙니다: {path}")
+    if artifact.get("version", 0) > ARTIFACT_VERSION:
+        raise ValueError(f"지원하지 않는 평가 결과 버전: {artifact.get('version')} ({path})")
+    return artifact
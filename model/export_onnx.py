@@ -0,0 +1,167 @@
+# 학습된 KM-BERT 분류 모델(trained_kmbert_model)을 ONNX로 내보내고 INT8 동적 양자화 버전을 만드는 스크립트
+# 내보낸 뒤 dataset/test_data 전체에 대해 PyTorch 모델과의 top-1 / top-3 일치율을 확인함
+#
+# 실행 (저장소 루트에서):
+#   python -m model.export_onnx --model-dir ./trained_kmbert_model
+#
+# 결과물은 모델 폴더 안의 model.onnx / model.int8.onnx 로 저장되며
+# predict_specialty.load_model(model_dir, backend="onnx" 또는 "onnx-int8")로 사용할 수 있음
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+ONNX_FILES = {
+    "onnx": "model.onnx",
+    "onnx-int8": "model.int8.onnx",
+}
+OPSET_VERSION = 14
+TEST_DIR = "./dataset/test_data"
+
+
+# ✅ ONNX Runtime 세션을 transformers 모델처럼 호출할 수 있게 감싼 클래스
+# - model(**inputs).logits 형태를 그대로 지원하므로 predict_departments를 수정 없이 재사용
+class OnnxSequenceClassifier:
+    def __init__(self, onnx_path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        width = self.session.get_outputs()[0].shape[-1]
+        self.num_labels = width if isinstance(width, int) else None  # logits 출력 폭 (동적 차원이면 None)
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        feed = {}
+        for name in self.input_names:
+            value = inputs.get(name)
+            if value is None and name == "token_type_ids":
+                value = torch.zeros_like(torch.as_tensor(inputs["input_ids"]))
+            feed[name] = np.asarray(torch.as_tensor(value).cpu().numpy(), dtype=np.int64)
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+# ✅ logits만 반환하도록 감싼 모듈 (ONNX 그래프 출력을 단일 텐서로 고정)
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        ).logits
+
+
+def export(model_dir, output_dir):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    dummy = tokenizer(["샘플 문장입니다", "두 번째 샘플"], padding=True, return_tensors="pt")
+    if "token_type_ids" not in dummy:
+        dummy["token_type_ids"] = torch.zeros_like(dummy["input_ids"])
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, ONNX_FILES["onnx"])
+    int8_path = os.path.join(output_dir, ONNX_FILES["onnx-int8"])
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            tuple(dummy[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET_VERSION,
+        )
+    print(f"✅ ONNX 내보내기 완료: {fp32_path}")
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✅ INT8 동적 양자화 완료: {int8_path}")
+
+    return tokenizer, model, {"onnx": fp32_path, "onnx-int8": int8_path}
+
+
+# ✅ 배치 단위 logits 계산 (길이순 정렬 + 배치별 동적 패딩, 결과는 입력 순서로 복원)
+def compute_logits(model, tokenizer, texts, batch_size=32, max_length=512):
+    from model.predict_specialty import length_sorted_batches
+
+    logits = [None] * len(texts)
+    with torch.inference_mode():
+        for batch_idx, inputs in length_sorted_batches(tokenizer, texts, batch_size, max_length):
+            out = model(**inputs).logits.numpy()
+            for row, i in enumerate(batch_idx):
+                logits[i] = out[row]
+    return np.stack(logits)
+
+
+# ✅ PyTorch 모델과의 일치율 확인
+# - top1_agreement: 1순위 예측이 같은 비율
+# - top3_agreement: 상위 3개 진료과 집합이 같은 비율
+def parity_check(tokenizer, torch_model, onnx_paths, test_dir, batch_size=32, max_length=512):
+    from corpus.loader import iter_examples
+
+    texts = [text for text, _ in iter_examples(test_dir)]
+    print(f"📂 평가 문서 수: {len(texts)}건 ({test_dir})")
+
+    start = time.perf_counter()
+    reference = compute_logits(torch_model, tokenizer, texts, batch_size, max_length)
+    reference_time = time.perf_counter() - start
+    ref_top1 = reference.argmax(axis=1)
+    ref_top3 = np.sort(np.argsort(-reference, axis=1)[:, :3], axis=1)
+
+    report = {}
+    for name, path in onnx_paths.items():
+        start = time.perf_counter()
+        logits = compute_logits(OnnxSequenceClassifier(path), tokenizer, texts, batch_size, max_length)
+        elapsed = time.perf_counter() - start
+        top3 = np.sort(np.argsort(-logits, axis=1)[:, :3], axis=1)
+        report[name] = {
+            "top1_agreement": float((logits.argmax(axis=1) == ref_top1).mean()),
+            "top3_agreement": float((top3 == ref_top3).all(axis=1).mean()),
+            "max_abs_logit_diff": float(np.abs(logits - reference).max()),
+            "speedup": reference_time / elapsed if elapsed else float("inf"),
+        }
+
+    print(f"\n📊 PyTorch 대비 일치율 (PyTorch 추론 {reference_time:.1f}s)")
+    for name, r in report.items():
+        print(f"{name:<10} top1: {r['top1_agreement']:.4f}  top3: {r['top3_agreement']:.4f}  "
+              f"max|Δlogit|: {r['max_abs_logit_diff']:.4f}  속도: x{r['speedup']:.2f}")
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KM-BERT 분류 모델 ONNX 내보내기 + INT8 양자화")
+    parser.add_argument("--model-dir", default="./trained_kmbert_model")
+    parser.add_argument("--output-dir", default=None, help="기본값: --model-dir")
+    parser.add_argument("--test-dir", default=TEST_DIR)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--skip-parity", action="store_true", help="일치율 확인 생략")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    tokenizer, torch_model, onnx_paths = export(args.model_dir, args.output_dir or args.model_dir)
+    if not args.skip_parity:
+        parity_check(tokenizer, torch_model, onnx_paths, args.test_dir, args.batch_size, args.max_length)
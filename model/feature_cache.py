@@ -0,0 +1,231 @@
+# 고정(frozen) 인코더 특징 캐시 + 분류 헤드 실험
+# - km-bert practice/specialty_prediction.py의 BERTClassifier는 에포크마다 인코더 전체를 다시 실행하지만
+#   인코더를 고정하면 헤드(fc1 → ReLU → Dropout → fc2)의 입력은 항상 같음
+# - 말뭉치 전체의 [CLS] 또는 평균 풀링 임베딩을 배치 단위로 한 번만 계산해 float32 .npy로 저장 (메모리 매핑으로 사용)
+# - 헤드 학습 / 평가는 캐시된 특징만으로 진행하므로 실험 한 번이 수 초
+# - 캐시 키: 원본 데이터 해시 + 인코더 이름 + 풀링 방식 + max_length
+#
+# 실행 (저장소 루트에서):
+#   python -m model.feature_cache --train-dir ./dataset/train_data --test-dir ./dataset/test_data \
+#       --pooling cls --hidden-sizes 128,256,512 --epochs 30
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from corpus.loader import iter_examples
+from model.cli_args import int_list
+from model.disease_index import embed_texts
+from model.tokenized_cache import atomic_cache_dir, source_fingerprint, write_meta
+
+MODEL_NAME = "madatnlp/km-bert"
+CACHE_DIR = "./.cache/features"
+POOLINGS = ("cls", "mean")
+CHUNK_DOCS = 4096  # 한 번에 토크나이징 / 임베딩하는 문서 수 (메모리 상한)
+META_FILE = "meta.json"
+
+
+def feature_key(train_dir, test_dir, encoder_name, pooling, max_length):
+    spec = {
+        "train": source_fingerprint(train_dir),
+        "test": source_fingerprint(test_dir),
+        "encoder": encoder_name,
+        "pooling": pooling,
+        "max_length": max_length,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+
+
+# ✅ 데이터 폴더 전체 임베딩을 .npy 파일에 직접 기록
+# - 1차: 라벨만 읽어 문서 수 확인 / 2차: CHUNK_DOCS개씩 임베딩해 메모리 매핑된 배열에 채움
+def extract_features(data_dir, path, tokenizer, encoder, pooling="cls", batch_size=64, max_length=256):
+    labels = [label for _, label in iter_examples(data_dir)]
+    features = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(len(labels), encoder.config.hidden_size)
+    )
+
+    offset = 0
+    chunk = []
+    for text, _ in iter_examples(data_dir):
+        chunk.append(text)
+        if len(chunk) == CHUNK_DOCS:
+            features[offset:offset + len(chunk)] = embed_texts(chunk, tokenizer, encoder, batch_size, max_length, pooling)
+            offset += len(chunk)
+            chunk = []
+            print(f"🔹 {offset}/{len(labels)}")
+    if chunk:
+        features[offset:offset + len(chunk)] = embed_texts(chunk, tokenizer, encoder, batch_size, max_length, pooling)
+    features.flush()
+    del features
+    return labels
+
+
+# ✅ 특징 캐시 불러오기 (없으면 인코더로 계산해 저장)
+# - 반환: (train_x, train_y, test_x, test_y, label_classes) / x는 읽기 전용 메모리 매핑 배열
+def load_features(train_dir, test_dir, encoder_name=MODEL_NAME, pooling="cls", max_length=256,
+                  batch_size=64, cache_dir=CACHE_DIR):
+    key = feature_key(train_dir, test_dir, encoder_name, pooling, max_length)
+    path = os.path.join(cache_dir, key)
+
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+
+        tokenizer = AutoTokenizer.from_pretrained(encoder_name)
+        encoder = AutoModel.from_pretrained(encoder_name).eval()
+        if torch.cuda.is_available():
+            encoder.to("cuda")
+
+        with atomic_cache_dir(path) as tmp_path:
+            start = time.perf_counter()
+            splits = {}
+            for split, data_dir in (("train", train_dir), ("test", test_dir)):
+                splits[split] = extract_features(
+                    data_dir, os.path.join(tmp_path, f"{split}.npy"), tokenizer, encoder, pooling, batch_size, max_length
+                )
+
+            label_classes = sorted(set(splits["train"]))
+            unseen = set(splits["test"]) - set(label_classes)
+            if unseen:
+                raise ValueError(f"평가 데이터에 학습 데이터에 없는 라벨이 있습니다: {sorted(unseen)}")
+            label2id = {label: i for i, label in enumerate(label_classes)}
+            for split, labels in splits.items():
+                np.save(os.path.join(tmp_path, f"{split}_labels.npy"), np.array([label2id[l] for l in labels], dtype=np.int64))
+
+            meta = {
+                "encoder": encoder_name,
+                "pooling": pooling,
+                "max_length": max_length,
+                "label_classes": label_classes,
+                "train_size": len(splits["train"]),
+                "test_size": len(splits["test"]),
+                "extract_seconds": round(time.perf_counter() - start, 1),
+            }
+            write_meta(tmp_path, meta)
+        print(f"✅ 특징 캐시 저장: {path} ({meta['extract_seconds']}s)")
+    else:
+        print(f"✅ 특징 캐시 사용: {path}")
+
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    return (
+        np.load(os.path.join(path, "train.npy"), mmap_mode="r"),
+        np.load(os.path.join(path, "train_labels.npy")),
+        np.load(os.path.join(path, "test.npy"), mmap_mode="r"),
+        np.load(os.path.join(path, "test_labels.npy")),
+        meta["label_classes"],
+    )
+
+
+def build_head(input_size, num_classes, hidden_size=256, dropout=0.3):
+    import torch.nn as nn
+
+    # BERTClassifier와 같은 구성: fc1 → ReLU → Dropout → fc2
+    return nn.Sequential(
+        nn.Linear(input_size, hidden_size),
+        nn.ReLU(),
+        nn.Dropout(dropout),
+        nn.Linear(hidden_size, num_classes),
+    )
+
+
+def predict_logits(head, features, batch_size=4096):
+    import torch
+
+    head.eval()
+    logits = []
+    with torch.inference_mode():
+        for i in range(0, len(features), batch_size):
+            logits.append(head(torch.from_numpy(np.array(features[i:i + batch_size]))).numpy())
+    return np.concatenate(logits) if logits else np.zeros((0, 0), dtype=np.float32)
+
+
+def evaluate_head(head, features, labels, num_classes):
+    from sklearn.metrics import accuracy_score, f1_score, top_k_accuracy_score
+
+    logits = predict_logits(head, features)
+    preds = logits.argmax(axis=1)
+    return {
+        "accuracy": accuracy_score(labels, preds),
+        "f1_macro": f1_score(labels, preds, average="macro"),
+        "top3_accuracy": top_k_accuracy_score(labels, logits, k=3, labels=np.arange(num_classes)),
+    }
+
+
+# ✅ 캐시된 특징으로 분류 헤드 학습 (인코더는 실행하지 않음)
+def train_head(train_x, train_y, num_classes, hidden_size=256, dropout=0.3, epochs=30, lr=1e-3,
+               batch_size=256, seed=42):
+    import torch
+    import torch.nn as nn
+    import torch.optim as optim
+
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    head = build_head(train_x.shape[1], num_classes, hidden_size, dropout)
+    optimizer = optim.Adam(head.parameters(), lr=lr)
+    criterion = nn.CrossEntropyLoss()
+
+    # 🔸 특징이 메모리에 들어가는 크기면 한 번에 올려 두고, 아니면 배치마다 메모리 매핑에서 읽음
+    features = np.array(train_x) if train_x.nbytes <= (1 << 30) else train_x
+    targets = torch.from_numpy(np.asarray(train_y))
+    for epoch in range(epochs):
+        head.train()
+        total_loss = 0.0
+        order = rng.permutation(len(train_y))
+        for i in range(0, len(order), batch_size):
+            idx = np.sort(order[i:i + batch_size])
+            optimizer.zero_grad()
+            loss = criterion(head(torch.from_numpy(np.array(features[idx]))), targets[idx])
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(idx)
+        if (epoch + 1) % 10 == 0 or epoch == epochs - 1:
+            print(f"Epoch {epoch + 1} | Loss: {total_loss / len(order):.4f}")
+    return head
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="고정 인코더 특징 캐시 + 분류 헤드 실험")
+    parser.add_argument("--train-dir", default="./dataset/train_data")
+    parser.add_argument("--test-dir", default="./dataset/test_data")
+    parser.add_argument("--encoder", default=MODEL_NAME)
+    parser.add_argument("--pooling", choices=POOLINGS, default="cls")
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--hidden-sizes", type=int_list, default=[256])
+    parser.add_argument("--dropout", type=float, default=0.3)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--save", default=None, help="마지막 헤드 가중치 저장 경로 (.pt)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    train_x, train_y, test_x, test_y, label_classes = load_features(
+        args.train_dir, args.test_dir, args.encoder, args.pooling, args.max_length, args.embed_batch_size
+    )
+    print(f"📂 학습 {len(train_y)}건 / 평가 {len(test_y)}건, 특징 차원 {train_x.shape[1]} ({args.pooling})")
+
+    print(f"\n{'hidden':>6} {'acc':>7} {'f1':>7} {'top3':>7} {'sec':>6}")
+    for hidden_size in args.hidden_sizes:
+        start = time.perf_counter()
+        head = train_head(train_x, train_y, len(label_classes), hidden_size, args.dropout,
+                          args.epochs, args.lr, args.batch_size)
+        metrics = evaluate_head(head, test_x, test_y, len(label_classes))
+        print(f"{hidden_size:>6} {metrics['accuracy']:>7.4f} {metrics['f1_macro']:>7.4f} "
+              f"{metrics['top3_accuracy']:>7.4f} {time.perf_counter() - start:>6.1f}")
+
+    if args.save:
+        import torch
+
+        torch.save({"state_dict": head.state_dict(), "label_classes": label_classes,
+                    "encoder": args.encoder, "pooling": args.pooling, "hidden_size": args.hidden_sizes[-1]},
+                   args.save)
+        print(f"✅ 헤드 저장: {args.save}")
@@ -0,0 +1,174 @@
+# 증분 학습 (새로 수집된 문서만으로 최신 번들을 짧게 미세조정)
+# - 마지막 번들(model.bundle)을 불러와 번들 메타데이터의 데이터 기준일(data_watermark) 이후 작성된 문서만 선택
+#   (기준일 당일 문서는 번들에 기록된 당일 학습 문서 키(data_watermark_keys)에 없는 것만 새 문서로 취급)
+# - 이전 문서 일부를 무작위로 섞어(replay) 기존 진료과를 잊지 않도록 함 (새 문서 1건당 --replay-ratio건)
+# - 학습 step 수를 --max-steps로 제한해 매일 갱신이 수 분 안에 끝나도록 함
+# - 새 번들에는 새 데이터 기준일과 증분 학습 내역(이전 번들 / 기준일 / 새 문서 수 / replay 수 / step 수)을 기록
+#
+# 실행 (저장소 루트에서):
+#   python -m model.incremental --bundle ./kmbert_bundle.safetensors --train-dir ./train_data \
+#       --max-steps 300 --replay-ratio 1.0 --test-dir ./dataset/test_data
+
+import argparse
+import math
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from corpus.loader import iter_examples, iter_records, record_date, record_key, record_text
+
+BUNDLE_PATH = "./kmbert_bundle.safetensors"
+
+
+# ✅ 새 문서 / replay 문서 선택 (폴더를 스트리밍으로 두 번 읽음)
+# - 새 문서: 기준일 이후 작성 + 기준일 당일 작성이지만 since_keys(이전 학습 때 당일 문서 키)에 없는 문서
+# - 1차: 새 문서 수집 + 이전 문서 수 세기 / 2차: 이전 문서에서 replay_count건을 균등 추출
+# - 반환: (새 문서, replay 문서, 번들에 없는 진료과별 제외 수, 새 데이터 기준일, 새 기준일 당일 문서 키 목록)
+def select_records(data_dir, since, label_classes, replay_ratio=1.0, seed=42, since_keys=()):
+    known = set(label_classes)
+    since_keys = set(since_keys)
+
+    def is_new(doc, doc_date):
+        return doc_date is not None and (doc_date > since or (doc_date == since and record_key(doc) not in since_keys))
+
+    new, old_count, skipped = [], 0, {}
+    latest, latest_keys = since, set(since_keys)
+    for doc in iter_records(data_dir):
+        label = doc["department"].strip()
+        if label not in known:
+            skipped[label] = skipped.get(label, 0) + 1  # 번들에 없는 진료과는 전체 재학습 필요
+            continue
+        doc_date = record_date(doc)
+        if is_new(doc, doc_date):
+            new.append((record_text(doc), label))
+            if doc_date > latest:
+                latest, latest_keys = doc_date, set()
+            if doc_date == latest:
+                latest_keys.add(record_key(doc))
+        else:
+            old_count += 1
+
+    rng = np.random.default_rng(seed)
+    replay_count = min(old_count, math.ceil(len(new) * replay_ratio))
+    chosen = set(rng.choice(old_count, replay_count, replace=False).tolist()) if replay_count else set()
+
+    replay, position = [], 0
+    if chosen:
+        for doc in iter_records(data_dir):
+            label = doc["department"].strip()
+            if label not in known or is_new(doc, record_date(doc)):
+                continue
+            if position in chosen:
+                replay.append((record_text(doc), label))
+            position += 1
+    return new, replay, skipped, latest, sorted(latest_keys)
+
+
+def tokenized_dataset(examples, tokenizer, label_classes, max_length):
+    from datasets import Dataset
+
+    label2id = {label: i for i, label in enumerate(label_classes)}
+    dataset = Dataset.from_dict({
+        "text": [text for text, _ in examples],
+        "labels": [label2id[label] for _, label in examples],
+    })
+    return dataset.map(lambda batch: tokenizer(batch["text"], truncation=True, max_length=max_length),
+                       batched=True, remove_columns=["text"])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KM-BERT 증분 학습 (새로 수집된 문서만)")
+    parser.add_argument("--bundle", default=BUNDLE_PATH, help="마지막 모델 번들")
+    parser.add_argument("--train-dir", required=True)
+    parser.add_argument("--test-dir", default=None, help="지정하면 학습 후 평가 결과 파일 저장")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="이 날짜 이후 문서만 사용 (기본: 번들의 data_watermark)")
+    parser.add_argument("--replay-ratio", type=float, default=1.0, help="새 문서 1건당 섞을 이전 문서 수")
+    parser.add_argument("--max-steps", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--learning-rate", type=float, default=1e-5)
+    parser.add_argument("--max-length", type=int, default=None, help="기본: 번들 학습 시 max_length")
+    parser.add_argument("--output", default=None, help="새 번들 경로 (기본: --bundle 덮어쓰기)")
+    parser.add_argument("--model-version", default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    from model import learning_model as lm
+    from model.bundle import load_bundle, save_bundle
+    from model.evaluation import evaluation_report, save_artifact
+
+    tokenizer, model, label_classes, training_meta = load_bundle(args.bundle)
+    since = args.since or (date.fromisoformat(training_meta["data_watermark"])
+                           if training_meta.get("data_watermark") else None)
+    if since is None:
+        raise SystemExit("번들에 데이터 기준일(data_watermark)이 없습니다. --since로 지정하세요")
+    max_length = args.max_length or training_meta.get("max_length", lm.MAX_LENGTH)
+    # 🔸 번들 기준일부터 이어서 학습할 때만 당일 학습 문서 키로 중복 제외 (--since를 따로 주면 당일 문서 모두 사용)
+    since_keys = (training_meta.get("data_watermark_keys", [])
+                  if since.isoformat() == training_meta.get("data_watermark") else [])
+
+    new, replay, skipped, watermark, watermark_keys = select_records(
+        args.train_dir, since, label_classes, args.replay_ratio, since_keys=since_keys
+    )
+    for label, count in skipped.items():
+        print(f"⚠️ 번들에 없는 진료과 '{label}' {count}건 제외 (전체 재학습 필요)")
+    if not new:
+        print(f"☑️ {since} 이후 새 문서가 없어 학습을 건너뜁니다")
+        raise SystemExit(0)
+    print(f"📂 {since} 이후 새 문서 {len(new)}건 + replay {len(replay)}건")
+
+    train_dataset = tokenized_dataset(new + replay, tokenizer, label_classes, max_length)
+    steps = min(args.max_steps, math.ceil(len(train_dataset) / args.batch_size))
+    model_version = args.model_version or f"kmbert_inc_{date.today():%Y%m%d}"
+    trainer = lm.build_trainer(
+        model, tokenizer, train_dataset, None,
+        lm.build_training_args(
+            args.batch_size, 1, args.learning_rate,
+            output_dir=os.path.join("./results", model_version),
+            max_steps=steps, eval_strategy="no", save_strategy="no", warmup_ratio=0.1,
+        ),
+        padding="dynamic",
+    )
+
+    start = time.perf_counter()
+    trainer.train()
+    train_seconds = time.perf_counter() - start
+    print(f"✅ 증분 학습 완료: {steps} step, {train_seconds:.1f}s")
+
+    output = args.output or args.bundle
+    metadata = {
+        **{k: v for k, v in training_meta.items() if k not in ("created_at", "incremental")},
+        "model_version": model_version,
+        "data_watermark": watermark.isoformat(),
+        "data_watermark_keys": watermark_keys,
+        "max_length": max_length,
+        "incremental": {
+            "base_bundle": os.path.abspath(args.bundle),
+            "base_model_version": training_meta.get("model_version"),
+            "since": since.isoformat(),
+            "new_records": len(new),
+            "replay_records": len(replay),
+            "steps": steps,
+            "learning_rate": args.learning_rate,
+            "train_seconds": round(train_seconds, 1),
+        },
+    }
+    # 🔸 기존 번들은 mmap으로 열려 있으므로 임시 파일에 저장한 뒤 교체
+    save_bundle(output + ".tmp", trainer.model, tokenizer, label_classes, metadata)
+    os.replace(output + ".tmp", output)
+    print(f"✅ 모델 번들 저장 완료: {output} (데이터 기준일 {watermark})")
+
+    if args.test_dir:
+        test = [(text, label) for text, label in iter_examples(args.test_dir) if label in set(label_classes)]
+        test_dataset = tokenized_dataset(test, tokenizer, label_classes, max_length)
+        predictions = trainer.predict(test_dataset)
+        report = evaluation_report(predictions.predictions, predictions.label_ids, label_classes)
+        path = save_artifact(report, model_version, {"bundle": output, "test_dir": args.test_dir,
+                                                     "incremental": metadata["incremental"]})
+        print(f"📊 accuracy {report['accuracy']:.4f} / f1_macro {report['f1_macro']:.4f} "
+              f"/ top3 {report['top_k_accuracy']['3']:.4f} → {path}")
@@ -1,23 +1,39 @@
+import argparse
 import os
-import json
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 import shutil
+from datetime import datetime
+
 import numpy as np
-from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
+from sklearn.metrics import classification_report
 
 import torch
-from datasets import Dataset
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
-    Trainer,
+    DataCollatorWithPadding,
     TrainingArguments
 )
-from sklearn.metrics import accuracy_score, f1_score
-from sklearn.metrics import top_k_accuracy_score
+
+from corpus.loader import data_watermark_keys
+from model.bundle import save_bundle
+from model.evaluation import evaluation_report, save_artifact, summary_metrics
+from model.tokenized_cache import load_tokenized_datasets
+from model.training_utils import (
+    CLASS_WEIGHTINGS,
+    ClassBalancedSampler,
+    EpochTimer,
+    SamplerTrainer,
+    SkipFinalEvaluation,
+    ThroughputMeter,
+    class_distribution,
+    configure_cpu_threads,
+    cpu_supports_bf16,
+    index_batches,
+    length_grouped_sampler,
+    padding_report,
+    print_epoch_summary,
+    time_training_steps,
+)
 
 # ⚙️ 설정
 MODEL_NAME = "madatnlp/km-bert"
@@ -25,95 +41,262 @@ TRAIN_DIR = "./drive/MyDrive/train_data"
 TEST_DIR = "./drive/MyDrive/test_data"
 BATCH_SIZE = 32
 EPOCHS = 5
+LEARNING_RATE = 2e-5
+MAX_LENGTH = 256
+BUNDLE_PATH = "./kmbert_bundle.safetensors"
+
+PADDING_MODES = ("max_length", "dynamic")
+PROFILES = ("default", "cpu")
+DRIVE_MOUNT = "/content/drive"
+DRIVE_OUTPUT_DIR = f"{DRIVE_MOUNT}/MyDrive/kmbert_saved_model"
+DEFAULT_THREADS = torch.get_num_threads()  # cpu 프로필 적용 전 torch 기본 스레드 수
+
+
+# ✅ 1~4. 데이터 불러오기 / 라벨 인코딩 / 토크나이징
+# 원본 JSON, 토크나이저, max_length가 그대로면 디스크 캐시(model.tokenized_cache)를 메모리 매핑으로 재사용
+# 🔸 padding="dynamic"이면 패딩 없이 토크나이징하고 배치마다 가장 긴 문장 길이로 패딩 (DataCollatorWithPadding)
+def load_datasets(tokenizer, train_dir=TRAIN_DIR, test_dir=TEST_DIR, max_length=MAX_LENGTH, padding="max_length"):
+    train_dataset, test_dataset, data_info = load_tokenized_datasets(
+        train_dir, test_dir, tokenizer, MODEL_NAME, max_length,
+        padding="max_length" if padding == "max_length" else None,
+    )
+    if padding == "max_length":
+        train_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
+        test_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
+    return train_dataset, test_dataset, data_info
 
-# ✅ 1. 데이터 로딩 함수
-def load_data(data_dir):
-    texts, labels = [], []
-    for fname in os.listdir(data_dir):
-        if not fname.endswith(".json"):
-            continue
-        with open(os.path.join(data_dir, fname), encoding="utf-8") as f:
-            docs = json.load(f)
-            for doc in docs:
-                text = doc["title"] + " " + doc["content"]
-                label = doc["department"].strip()
-                texts.append(text)
-                labels.append(label)
-    return pd.DataFrame({"text": texts, "label": labels})
-
-# ✅ 2. 데이터 불러오기
-train_df = load_data(TRAIN_DIR)
-test_df = load_data(TEST_DIR)
-
-# ✅ 3. 라벨 인코딩
-le = LabelEncoder()
-train_df["label_id"] = le.fit_transform(train_df["label"])
-test_df["label_id"] = le.transform(test_df["label"])
-NUM_LABELS = len(le.classes_)
-
-# ✅ 4. Dataset 변환 및 토크나이징
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-
-def tokenize(example):
-    return tokenizer(example["text"], truncation=True, padding="max_length", max_length=256)
-
-train_dataset = Dataset.from_pandas(train_df[["text", "label_id"]])
-test_dataset = Dataset.from_pandas(test_df[["text", "label_id"]])
-train_dataset = train_dataset.map(tokenize, batched=True)
-test_dataset = test_dataset.map(tokenize, batched=True)
-
-train_dataset = train_dataset.rename_column("label_id", "labels")
-test_dataset = test_dataset.rename_column("label_id", "labels")
-train_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
-test_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
 
 # ✅ 5. 모델 로딩
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, num_labels=NUM_LABELS)
+# 🔸 라벨 순서를 config(id2label)에 함께 저장해 서빙 쪽과 어긋나지 않도록 함
+def load_model(label_classes):
+    return AutoModelForSequenceClassification.from_pretrained(
+        MODEL_NAME,
+        num_labels=len(label_classes),
+        id2label=dict(enumerate(label_classes)),
+        label2id={label: i for i, label in enumerate(label_classes)},
+    )
 
-# ✅ 6. 평가 메트릭
+# ✅ 6. 평가 메트릭 (numpy logits 그대로 계산)
 def compute_metrics(p):
-    preds = torch.tensor(p.predictions)
-    top1_preds = torch.argmax(preds, dim=1)
-    labels = torch.tensor(p.label_ids)
-    top3_acc = top_k_accuracy_score(labels.numpy(), preds.numpy(), k=3)
-
-    return {
-        "accuracy": accuracy_score(labels, top1_preds),
-        "f1_macro": f1_score(labels, top1_preds, average="macro"),
-        "top3_accuracy": top3_acc
-    }
+    return summary_metrics(p.predictions, p.label_ids)
 
 # ✅ 7. 학습 인자
-training_args = TrainingArguments(
-    output_dir="./results",
-    eval_strategy="epoch",
-    save_strategy="steps",
-    save_steps=500,
-    save_total_limit=2,
-    learning_rate=2e-5,
-    per_device_train_batch_size=BATCH_SIZE,
-    per_device_eval_batch_size=BATCH_SIZE,
-    num_train_epochs=EPOCHS,
-    weight_decay=0.01,
-    logging_dir="./logs",
-    logging_steps=100,
-    disable_tqdm=False,
-    load_best_model_at_end=False,
-    report_to="none"
-)
+# 🔸 overrides로 output_dir / save_strategy 등 기본값을 바꿀 수 있음 (하이퍼파라미터 탐색 등)
+def build_training_args(batch_size=BATCH_SIZE, epochs=EPOCHS, learning_rate=LEARNING_RATE, **overrides):
+    kwargs = dict(
+        output_dir="./results",
+        eval_strategy="epoch",
+        save_strategy="steps",
+        save_steps=500,
+        save_total_limit=2,
+        learning_rate=learning_rate,
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        num_train_epochs=epochs,
+        weight_decay=0.01,
+        logging_dir="./logs",
+        logging_steps=100,
+        disable_tqdm=False,
+        load_best_model_at_end=False,
+        report_to="none"
+    )
+    kwargs.update(overrides)
+    return TrainingArguments(**kwargs)
 
 # ✅ 8. Trainer 생성
-trainer = Trainer(
-    model=model,
-    args=training_args,
-    train_dataset=train_dataset,
-    eval_dataset=test_dataset,
-    compute_metrics=compute_metrics,
-    tokenizer=tokenizer
-)
+# 🔸 dynamic 패딩이면 길이가 비슷한 문장끼리 배치를 묶어(에포크마다 다시 섞음) 배치 내 패딩을 최소화
+# 🔸 balance({"cap", "weighting", "budget"})가 주어지면 에포크마다 진료과 균형 샘플만 학습 (ClassBalancedSampler)
+def build_trainer(model, tokenizer, train_dataset, test_dataset, training_args, padding="max_length", callbacks=None,
+                  balance=None):
+    kwargs = {}
+    lengths = group_size = None
+    if padding == "dynamic":
+        lengths = [len(ids) for ids in train_dataset["input_ids"]]
+        group_size = training_args.per_device_train_batch_size * training_args.gradient_accumulation_steps
+        kwargs["data_collator"] = DataCollatorWithPadding(tokenizer)
+        kwargs["train_sampler_fn"] = lambda trainer: length_grouped_sampler(lengths, group_size)
+    if balance:
+        sampler = ClassBalancedSampler(
+            np.asarray(train_dataset["labels"]), balance.get("cap"), balance.get("weighting"), balance.get("budget"),
+            lengths=lengths, group_size=group_size, seed=training_args.seed,
+        )
+        kwargs["train_sampler_fn"] = lambda trainer: sampler
+
+    return SamplerTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=test_dataset,
+        compute_metrics=compute_metrics,
+        tokenizer=tokenizer,
+        callbacks=callbacks,
+        **kwargs
+    )
+
+
+# ✅ 패딩 비율 / 에포크 소요 시간 비교 (고정 max_length vs 동적 패딩 vs 동적 패딩 + 길이 그룹 배치)
+# - 패딩 비율: 전체 학습 데이터 기준 정확히 계산
+# - 에포크 시간: 방식별로 steps개 배치의 forward+backward 평균 시간 × 에포크당 배치 수
+def compare_padding(tokenizer, label_classes, train_dir, test_dir, batch_size, max_length, steps=20, seed=42):
+    train_dataset, _, _ = load_datasets(tokenizer, train_dir, test_dir, max_length, padding="dynamic")
+    train_dataset = train_dataset.remove_columns([c for c in train_dataset.column_names
+                                                  if c not in ("input_ids", "attention_mask", "labels")])
+    lengths = [len(ids) for ids in train_dataset["input_ids"]]
+    report = padding_report(lengths, batch_size, max_length, seed)
+
+    generator = torch.Generator().manual_seed(seed)
+    random_batches = index_batches(torch.randperm(len(lengths), generator=generator).tolist(), batch_size)
+    grouped_batches = index_batches(length_grouped_sampler(lengths, batch_size, generator), batch_size)
+    fixed_collator = DataCollatorWithPadding(tokenizer, padding="max_length", max_length=max_length)
+    dynamic_collator = DataCollatorWithPadding(tokenizer)
+
+    model = load_model(label_classes)
+    step_seconds = {
+        "max_length": time_training_steps(model, train_dataset, random_batches, fixed_collator, steps),
+        "dynamic": time_training_steps(model, train_dataset, random_batches, dynamic_collator, steps),
+        "dynamic_grouped": time_training_steps(model, train_dataset, grouped_batches, dynamic_collator, steps),
+    }
+
+    num_batches = len(random_batches)
+    print(f"\n📏 패딩 비율 / 에포크 소요 시간 추정 (학습 {len(lengths)}건, 배치 {batch_size}, 배치 수 {num_batches})")
+    print(f"{'mode':<16} {'pad':>7} {'step(s)':>9} {'epoch(s)':>10} {'speedup':>8}")
+    for mode in ("max_length", "dynamic", "dynamic_grouped"):
+        speedup = step_seconds["max_length"] / step_seconds[mode] if step_seconds[mode] else float("inf")
+        print(f"{mode:<16} {report[mode]:>7.1%} {step_seconds[mode]:>9.3f} "
+              f"{step_seconds[mode] * num_batches:>10.1f} {speedup:>7.2f}x")
+    return report, step_seconds
+
+
+# ✅ CPU 학습 프로필 (GPU 없는 학습 서버용 TrainingArguments 설정)
+# - torch intra-op / inter-op 스레드 수 설정 (가능한 한 일찍 호출해야 inter-op 설정이 적용됨)
+# - bf16: "auto"면 CPU가 bf16을 지원할 때만 autocast 사용
+# - torch.compile / 데이터 로딩 워커 프로세스
+def cpu_profile(threads=None, interop_threads=None, bf16="auto", torch_compile=False, dataloader_workers=2):
+    threads, interop_threads = configure_cpu_threads(threads, interop_threads)
+    use_bf16 = cpu_supports_bf16() if bf16 == "auto" else bf16 == "on"
+    print(f"🖥️ CPU 프로필: intra-op {threads} / inter-op {interop_threads} 스레드, bf16={use_bf16}, "
+          f"compile={torch_compile}, 데이터 로딩 워커 {dataloader_workers}개")
+    return dict(
+        use_cpu=True,
+        bf16=use_bf16,
+        torch_compile=torch_compile,
+        dataloader_num_workers=dataloader_workers,
+        dataloader_persistent_workers=dataloader_workers > 0,
+        dataloader_pin_memory=False,
+    )
+
+
+# ✅ 기본 설정과 CPU 프로필의 학습 처리량(초당 샘플 수) 비교 (같은 장비, 같은 데이터, warmup 이후 steps개 step)
+def compare_profiles(tokenizer, label_classes, train_dataset, test_dataset, args, profile_overrides, steps, warmup=5):
+    # 🔸 intra-op 스레드 수는 실행마다 바꿔 적용 (inter-op 스레드 수는 프로세스 시작 후 바꿀 수 없어 두 실행이 공유)
+    profile_threads = torch.get_num_threads()
+    results = {}
+    for name, overrides, threads in (("default", {}, DEFAULT_THREADS), ("cpu", profile_overrides, profile_threads)):
+        torch.set_num_threads(threads)
+        meter = ThroughputMeter(warmup)
+        training_args = build_training_args(
+            args.batch_size, args.epochs, args.learning_rate,
+            output_dir=os.path.join("./results", f"throughput_{name}"),
+            max_steps=steps + warmup, eval_strategy="no", save_strategy="no", disable_tqdm=True,
+            **overrides,
+        )
+        trainer = build_trainer(load_model(label_classes), tokenizer, train_dataset, test_dataset,
+                                training_args, padding=args.padding, callbacks=[meter])
+        trainer.train()
+        results[name] = meter.samples_per_second
+        print(f"⏱️ {name}: {meter.samples_per_second:.2f} samples/s")
+
+    print(f"✅ CPU 프로필 처리량: 기본 대비 {results['cpu'] / results['default']:.2f}배")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KM-BERT 진료과 분류 모델 학습")
+    parser.add_argument("--train-dir", default=TRAIN_DIR)
+    parser.add_argument("--test-dir", default=TEST_DIR)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--learning-rate", type=float, default=LEARNING_RATE)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--padding", choices=PADDING_MODES, default="max_length",
+                        help="max_length: 모든 문장을 max_length로 패딩 / dynamic: 배치별 동적 패딩 + 길이 그룹 배치")
+    parser.add_argument("--class-cap", type=int, default=None, help="에포크당 진료과별 최대 샘플 수")
+    parser.add_argument("--class-weighting", choices=CLASS_WEIGHTINGS, default=None,
+                        help="진료과 크기에 반비례(inverse) / 제곱근 반비례(sqrt) 확률로 샘플링")
+    parser.add_argument("--epoch-budget", type=int, default=None, help="에포크당 학습 샘플 수")
+    parser.add_argument("--profile", choices=PROFILES, default="default",
+                        help="cpu: GPU 없는 학습 서버용 설정 (스레드 / bf16 / torch.compile / 데이터 로딩 워커)")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op 스레드 수 (cpu 프로필, 기본: torch 기본값)")
+    parser.add_argument("--interop-threads", type=int, default=None, help="inter-op 스레드 수 (cpu 프로필)")
+    parser.add_argument("--bf16", choices=("auto", "on", "off"), default="auto", help="bf16 autocast (cpu 프로필)")
+    parser.add_argument("--compile", action="store_true", help="torch.compile 사용 (cpu 프로필)")
+    parser.add_argument("--dataloader-workers", type=int, default=2, help="데이터 로딩 워커 프로세스 수 (cpu 프로필)")
+    parser.add_argument("--compare-profiles", type=int, default=0, metavar="STEPS",
+                        help="학습 대신 기본 설정과 cpu 프로필의 초당 학습 샘플 수를 STEPS개 step으로 비교")
+    parser.add_argument("--drive-dir", default=DRIVE_OUTPUT_DIR,
+                        help="학습된 모델을 복사할 Google Drive 폴더 (빈 문자열이면 복사하지 않음)")
+    parser.add_argument("--model-version", default=datetime.now().strftime("kmbert_%Y%m%d_%H%M%S"),
+                        help="평가 결과 파일 이름 / 번들 메타데이터에 기록할 모델 버전")
+    parser.add_argument("--compare-padding", type=int, default=0, metavar="STEPS",
+                        help="학습 대신 패딩 방식별 패딩 비율과 에포크 소요 시간을 STEPS개 배치로 비교")
+    return parser.parse_args()
+
 
 # ✅ 9. 학습 및 저장
 if __name__ == "__main__":
+    args = parse_args()
+
+    # 🔸 inter-op 스레드 수는 torch 병렬 연산이 실행되기 전에 정해야 하므로 데이터 / 모델 로딩 전에 적용
+    profile_overrides = {}
+    if args.profile == "cpu" or args.compare_profiles:
+        profile_overrides = cpu_profile(args.threads, args.interop_threads, args.bf16, args.compile,
+                                        args.dataloader_workers)
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    train_dataset, test_dataset, data_info = load_datasets(
+        tokenizer, args.train_dir, args.test_dir, args.max_length, args.padding
+    )
+    label_classes = data_info["label_classes"]
+
+    if args.compare_profiles:
+        compare_profiles(tokenizer, label_classes, train_dataset, test_dataset, args, profile_overrides,
+                         args.compare_profiles)
+        raise SystemExit(0)
+
+    if args.compare_padding:
+        compare_padding(tokenizer, label_classes, args.train_dir, args.test_dir,
+                        args.batch_size, args.max_length, args.compare_padding)
+        raise SystemExit(0)
+
+    if args.padding == "dynamic":
+        report = padding_report([len(ids) for ids in train_dataset["input_ids"]], args.batch_size, args.max_length)
+        print(f"📏 패딩 비율: max_length {report['max_length']:.1%} → 동적 {report['dynamic']:.1%} "
+              f"→ 동적 + 길이 그룹 {report['dynamic_grouped']:.1%}")
+
+    balance = None
+    if args.class_cap or args.class_weighting or args.epoch_budget:
+        balance = {"cap": args.class_cap, "weighting": args.class_weighting, "budget": args.epoch_budget}
+
+    model = load_model(label_classes)
+    epoch_timer = EpochTimer()
+    trainer = build_trainer(
+        model, tokenizer, train_dataset, test_dataset,
+        build_training_args(args.batch_size, args.epochs, args.learning_rate,
+                            **(profile_overrides if args.profile == "cpu" else {})),
+        padding=args.padding, callbacks=[epoch_timer, SkipFinalEvaluation()], balance=balance,
+    )
+    samples_per_epoch = len(trainer.train_sampler_fn(trainer)) if balance else len(train_dataset)
+    print(f"📂 에포크당 학습 샘플: {samples_per_epoch}건 / 전체 {len(train_dataset)}건")
+    if balance:
+        # 🔸 진료과별 원본 수 / 첫 에포크 샘플 수 (샘플러의 에포크 순서는 바꾸지 않음)
+        sampler = trainer.train_sampler_fn(trainer)
+        train_labels = np.asarray(train_dataset["labels"])
+        original = class_distribution(train_labels)
+        sampled = class_distribution(train_labels, sampler.sample_indices(np.random.default_rng(sampler.seed)))
+        print(f"{'진료과':<12} {'원본':>7} {'에포크당':>8}")
+        for label_id, count in sorted(original.items(), key=lambda item: -item[1]):
+            print(f"{label_classes[label_id]:<12} {count:>7} {sampled.get(label_id, 0):>8}")
+
     resume_path = "./results/checkpoint-6000" if os.path.exists("./results/checkpoint-6000") else None
     trainer.train(resume_from_checkpoint=resume_path)
 
@@ -123,41 +306,71 @@ if __name__ == "__main__":
 
     print("✅ 학습 완료 및 로컬 저장 완료")
 
-    # ✅ Google Drive 저장
-    drive_output_dir = "/content/drive/MyDrive/kmbert_saved_model"
-    os.makedirs(drive_output_dir, exist_ok=True)
-
-    for file_name in os.listdir(local_output_dir):
-      src = os.path.join(local_output_dir, file_name)
-      dst = os.path.join(drive_output_dir, file_name)
-      if os.path.isfile(src):
-          shutil.copy2(src, dst)  # ✅ 안전하게 복사
+    # ✅ 단일 파일 번들 저장 (가중치 + 토크나이저 + 라벨 순서 + 학습 메타데이터)
+    watermark, watermark_keys = data_watermark_keys(args.train_dir)
+    save_bundle(BUNDLE_PATH, trainer.model, tokenizer, label_classes, {
+        "base_model": MODEL_NAME,
+        "model_version": args.model_version,
+        "train_dir": args.train_dir,
+        "data_watermark": watermark,
+        "data_watermark_keys": watermark_keys,  # 기준일 당일 학습한 문서 (model.incremental 중복 방지)
+        "train_size": data_info["train_size"],
+        "label_counts": data_info["label_counts"],
+        "epochs": args.epochs,
+        "batch_size": args.batch_size,
+        "learning_rate": args.learning_rate,
+        "max_length": args.max_length,
+        "padding": args.padding,
+        "profile": args.profile,
+        "class_balance": balance,
+        "samples_per_epoch": samples_per_epoch,
+        "epoch_seconds": epoch_timer.epoch_seconds,
+    })
+    print(f"✅ 모델 번들 저장 완료: {BUNDLE_PATH}")
 
-    print(f"✅ 모델이 Google Drive에 저장되었습니다: {drive_output_dir}")
+    # ✅ Google Drive 저장 (Drive가 마운트된 환경에서만)
+    # 🔸 마운트되지 않은 Colab에서 로컬 /content/drive 폴더를 만들지 않도록 마운트 지점을 직접 확인
+    drive_output_dir = args.drive_dir
+    if drive_output_dir and drive_output_dir.startswith(DRIVE_MOUNT + "/") and not os.path.ismount(DRIVE_MOUNT):
+        print(f"☑️ Google Drive가 마운트되지 않아 복사를 건너뜁니다: {DRIVE_MOUNT}")
+    elif drive_output_dir:
+        try:
+            os.makedirs(drive_output_dir, exist_ok=True)
+            for file_name in os.listdir(local_output_dir):
+                src = os.path.join(local_output_dir, file_name)
+                dst = os.path.join(drive_output_dir, file_name)
+                if os.path.isfile(src):
+                    shutil.copy2(src, dst)  # ✅ 안전하게 복사
+            print(f"✅ 모델이 Google Drive에 저장되었습니다: {drive_output_dir}")
+        except OSError as e:
+            print(f"⚠️ Google Drive 복사 실패: {drive_output_dir} -> {e}")
 
-    # ✅ 최종 성능 평가
-    metrics = trainer.evaluate()
+    # ✅ 최종 성능 평가 (테스트 데이터 추론 한 번으로 요약 지표 / 진료과별 지표 / 혼동 행렬을 모두 계산)
+    # 🔸 마지막 에포크 평가는 SkipFinalEvaluation으로 생략했으므로 이 predict가 최종 에포크의 유일한 테스트 추론
+    predictions = trainer.predict(test_dataset)
+    print_epoch_summary(epoch_timer.epoch_seconds, trainer.state.log_history, samples_per_epoch,
+                        predictions.metrics.get("test_f1_macro"))
     print("\n📊 최종 성능 지표:")
-    for key, value in metrics.items():
+    for key, value in predictions.metrics.items():
         print(f"{key:<15}: {value:.4f}")
 
-    # ✅ 예측 결과 추출
-    predictions = trainer.predict(test_dataset)
     preds = np.argmax(predictions.predictions, axis=1)
     labels = predictions.label_ids
 
     # ✅ 진료과별 성능 지표 출력
     print("\n📋 진료과별 성능 보고서 (classification_report):")
-    print(classification_report(labels, preds, target_names=le.classes_))
-
-    # ✅ Confusion Matrix 출력
-    cm = confusion_matrix(labels, preds)
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(cm, annot=True, fmt="d", xticklabels=le.classes_, yticklabels=le.classes_, cmap="Blues")
-    plt.xlabel("Predicted Label")
-    plt.ylabel("True Label")
-    plt.title("Confusion Matrix")
-    plt.xticks(rotation=90)
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-    plt.show()
+    print(classification_report(labels, preds, labels=range(len(label_classes)),
+                                target_names=label_classes, zero_division=0))
+
+    # ✅ 평가 결과 파일 저장 (model.visualize_result로 버전 간 비교 / 혼동 행렬 그림 생성)
+    report = evaluation_report(predictions.predictions, labels, label_classes)
+    artifact_path = save_artifact(report, args.model_version, {
+        "bundle": BUNDLE_PATH,
+        "test_dir": args.test_dir,
+        "max_length": args.max_length,
+        "padding": args.padding,
+    })
+    print(f"✅ 평가 결과 저장: {artifact_path}")
+
+    from model.visualize_result import plot_confusion_matrix
+    print(f"✅ Confusion Matrix 저장: {plot_confusion_matrix(artifact_path)}")
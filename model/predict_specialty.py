@@ -1,18 +1,21 @@
+import os
+import threading
+
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch.nn.functional as F
-import pandas as pd
-import numpy as np
 
-# ✅ 모델 경로 설정 (Google Drive 기준)
-MODEL_DIR = "/content/drive/MyDrive/kmbert_saved_model"
+from model.bundle import is_bundle, load_bundle
+# ✅ 모델 경로 / 길이 / 배치 / 백엔드 기본값은 torch 없이 import할 수 있는 model.defaults에 둠 (여기서도 그대로 사용 가능)
+from model.defaults import BACKEND, BACKENDS, BATCH_SIZE, MAX_LENGTH, MODEL_DIR
 
-# ✅ 모델 및 토크나이저 불러오기
-tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
-model.eval()  # 평가 모드
+# ✅ 모델 및 토크나이저 (load_model 호출 시 한 번만 불러옴)
+tokenizer = None
+model = None
+_load_lock = threading.Lock()
 
 # ✅ 학습 시 사용했던 LabelEncoder의 클래스 목록 (순서 중요)
+# 라벨이 들어 있지 않은 예전 모델 폴더용 기본값 (번들 / id2label이 있으면 그 값으로 대체)
 label_classes = [
     '가정의학과', '감염내과', '내분비대사내과', '류마티스내과', '마취통증의학과', '비뇨의학과', '산부인과',
     '성형외과', '소아청소년과', '소화기내과', '순환기내과', '신경과', '신경외과', '신장내과', '안과',
@@ -20,18 +23,91 @@ label_classes = [
     '피부과', '혈액종양내과', '호흡기내과', '흉부외과'
 ]
 
+# ✅ 모델 로딩 함수
+# - import 시점이 아니라 처음 필요할 때 한 번만 불러오고 이후 호출은 그대로 재사용
+# - model_dir가 .safetensors 번들(model.bundle)이면 번들에 들어 있는 라벨 순서를 그대로 사용
+def load_model(model_dir=MODEL_DIR, backend=BACKEND):
+    global tokenizer, model, label_classes
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+    with _load_lock:
+        if model is None:
+            if is_bundle(model_dir):
+                if backend != "torch":
+                    raise ValueError("모델 번들은 torch 백엔드로만 불러올 수 있습니다")
+                tokenizer, model, label_classes, _ = load_bundle(model_dir)
+                return tokenizer, model
+
+            tokenizer = AutoTokenizer.from_pretrained(model_dir)
+            if backend == "torch":
+                model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+                config, num_labels = model.config, model.config.num_labels
+            else:
+                # 🔸 ONNX 파일은 모델 폴더 안에 저장되므로 같은 폴더의 config.json에서 torch와 같은 방식으로 라벨을 읽음
+                from transformers import AutoConfig
+                from model.export_onnx import ONNX_FILES, OnnxSequenceClassifier
+                model = OnnxSequenceClassifier(os.path.join(model_dir, ONNX_FILES[backend]))
+                config = AutoConfig.from_pretrained(model_dir)
+                num_labels = model.num_labels or config.num_labels
+            labels = _config_labels(config) or label_classes
+            if num_labels != len(labels):
+                raise ValueError(f"라벨 수 불일치: 모델 {num_labels}개, label_classes {len(labels)}개")
+            label_classes = labels
+            model.eval()  # 평가 모드
+    return tokenizer, model
+
+# ✅ config에 실제 진료과 이름이 저장된 모델이면 그 순서를 사용 (LABEL_0 형식이면 None)
+def _config_labels(config):
+    labels = [config.id2label[i] for i in range(config.num_labels)]
+    if all(label == f"LABEL_{i}" for i, label in enumerate(labels)):
+        return None
+    return labels
+
+def is_loaded():
+    return model is not None
+
+# ✅ 길이순 배치 생성
+# - 전체 입력을 한 번만 토크나이징한 뒤 토큰 길이 순으로 정렬해 비슷한 길이끼리 배치를 구성
+# - 배치마다 가장 긴 문장 길이까지만 패딩 (pad 토큰에 대한 어텐션 연산 최소화)
+# - (원래 입력 위치 목록, 모델 입력 텐서)를 차례로 반환
+def length_sorted_batches(tokenizer, texts, batch_size=BATCH_SIZE, max_length=MAX_LENGTH):
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch_idx]
+        yield batch_idx, tokenizer.pad(features, padding=True, return_tensors="pt")
+
+# ✅ logits → 입력별 [(진료과, 확률), ...]
+def top_k_departments(logits, top_k=3):
+    probs = F.softmax(logits, dim=-1)
+    top_probs, top_indices = torch.topk(probs, k=min(top_k, len(label_classes)), dim=-1)
+    return [
+        [(label_classes[idx], prob) for idx, prob in zip(indices, values)]
+        for indices, values in zip(top_indices.tolist(), top_probs.tolist())
+    ]
+
+# ✅ 배치 예측 함수
+# - 결과는 입력 순서대로 [(진료과, 확률), ...] 리스트로 반환하며 출력은 하지 않음
+def predict_departments(texts, batch_size=BATCH_SIZE, top_k=3, max_length=MAX_LENGTH):
+    texts = list(texts)
+    if not texts:
+        return []
+    load_model()
+
+    results = [None] * len(texts)
+    with torch.inference_mode():
+        for batch_idx, inputs in length_sorted_batches(tokenizer, texts, batch_size, max_length):
+            logits = model(**inputs).logits
+            for i, result in zip(batch_idx, top_k_departments(logits, top_k)):
+                results[i] = result
+    return results
+
 # ✅ 예측 함수
 def predict_department(text, top_k=3):
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        probs = F.softmax(logits, dim=1).squeeze()
-
-    # 상위 K개 추출
-    top_probs, top_indices = torch.topk(probs, k=top_k)
-    top_probs = top_probs.numpy()
-    top_labels = [label_classes[idx] for idx in top_indices]
+    result = predict_departments([text], batch_size=1, top_k=top_k)[0]
+    top_labels = [label for label, _ in result]
+    top_probs = [prob for _, prob in result]
 
     # 결과 출력
     print(f"📨 입력 문장: {text}\n")
@@ -39,8 +115,9 @@ def predict_department(text, top_k=3):
     for i in range(top_k):
         print(f"{i+1}. {top_labels[i]:<10} — 확률: {top_probs[i]*100:.2f}%")
 
-    return list(zip(top_labels, top_probs))
+    return result
 
 # ✅ 예시 테스트
-text = "요즘 정신이 흐릿한데 피곤한 걸까요? 뇌가 문제일까요?"
-predict_department(text)
+if __name__ == "__main__":
+    text = "요즘 정신이 흐릿한데 피곤한 걸까요? 뇌가 문제일까요?"
+    predict_department(text)
@@ -0,0 +1,140 @@
+# 진료과 예측 결과 캐시
+# - 질문 문장을 정규화(줄바꿈 제거 + 연속 공백 축소)한 값을 키로 사용
+# - 요청의 top_k와 관계없이 상위 cache_top_k개(기본: 사실상 전체 진료과)를 저장하고 조회 시 잘라서 반환
+#   → 마이크로 배치에 함께 묶인 요청의 top_k가 달라도 같은 질문은 같은 키
+# - 프로세스 내부 LRU(최대 개수 제한) + 선택적인 SQLite 디스크 저장소(재시작 후에도 유지)
+# - 캐시에 있는 질문은 트랜스포머 모델을 전혀 거치지 않음
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from data_cleaning.remove_line_breaking import remove_line_breaks
+from model import predict_specialty
+
+DEFAULT_MAX_SIZE = 10000
+CACHE_TOP_K = 64  # 진료과 수보다 크게 → 전체 순위 저장
+
+
+# ✅ 캐시 키용 문장 정규화
+def normalize_text(text):
+    return " ".join(remove_line_breaks(text).split())
+
+
+class PredictionCache:
+    # namespace: 모델 경로/백엔드 등 예측 결과가 달라지는 조건 (디스크 캐시 공유 시 구분용)
+    # predict_fn: 캐시 미적중 시 호출할 배치 예측 함수 (기본: predict_specialty.predict_departments)
+    # cache_top_k: 저장하는 순위 개수 (이보다 큰 top_k 요청도 cache_top_k개까지만 반환)
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, db_path=None, namespace="", predict_fn=None,
+                 cache_top_k=CACHE_TOP_K):
+        self.max_size = max_size
+        self.namespace = namespace
+        self.cache_top_k = cache_top_k
+        self.predict_fn = predict_fn or predict_specialty.predict_departments
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, result TEXT NOT NULL)"
+            )
+            self.db.commit()
+
+    def make_key(self, text):
+        raw = f"{self.namespace}\0{self.cache_top_k}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # 🔸 조회 (메모리 → 디스크 순, 디스크에서 찾으면 메모리로 올림)
+    def get(self, key):
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+            if self.db is None:
+                return None
+            row = self.db.execute("SELECT result FROM predictions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            result = [tuple(item) for item in json.loads(row[0])]
+            self.disk_hits += 1
+            self._remember(key, result)
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, result) VALUES (?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False)),
+                )
+                self.db.commit()
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    # ✅ 캐시를 거치는 배치 예측 (predict_specialty.predict_departments와 같은 반환 형식)
+    # - 캐시에 없는 문장만 모아 한 번에 모델로 보내고, 같은 배치 안의 중복 문장도 한 번만 계산
+    def predict_departments(self, texts, batch_size=predict_specialty.BATCH_SIZE, top_k=3, **kwargs):
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = OrderedDict()  # key -> (대표 문장, [입력 위치...])
+        hits = misses = 0
+
+        for i, text in enumerate(texts):
+            key = self.make_key(text)
+            if key in pending:
+                pending[key][1].append(i)
+                hits += 1
+                continue
+            cached = self.get(key)
+            if cached is not None:
+                results[i] = cached[:top_k]
+                hits += 1
+            else:
+                pending[key] = (text, [i])
+                misses += 1
+
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+        if pending:
+            computed = self.predict_fn(
+                [text for text, _ in pending.values()], batch_size=batch_size, top_k=self.cache_top_k, **kwargs
+            )
+            for (key, (_, positions)), result in zip(pending.items(), computed):
+                self.put(key, result)
+                for i in positions:
+                    results[i] = result[:top_k]
+        return results
+
+    def predict_department(self, text, top_k=3):
+        return self.predict_departments([text], batch_size=1, top_k=top_k)[0]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_size": len(self.memory),
+            }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
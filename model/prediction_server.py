@@ -0,0 +1,253 @@
+# 진료과 예측 모델을 한 번만 불러와 상주시키는 asyncio HTTP 서버
+# 동시에 들어온 요청을 모아 마이크로 배치로 predict_departments에 넘김
+#
+# 실행 (저장소 루트에서):
+#   python -m model.prediction_server --model-dir ./trained_kmbert_model --port 8000
+#
+# 엔드포인트:
+#   POST /predict  {"text": "..."} 또는 {"texts": ["...", ...]}, 선택적으로 "top_k"
+#   GET  /healthz  프로세스 생존 여부
+#   GET  /readyz   모델 로딩 완료 여부 (로딩 전에는 503)
+#   GET  /stats    예측 캐시 적중/미적중 횟수
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from model import predict_specialty
+from model.prediction_cache import PredictionCache
+
+MAX_BODY_BYTES = 1 << 20
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+# ✅ 마이크로 배처
+# - 첫 요청이 들어오면 max_wait_ms 동안 또는 max_batch_size개가 찰 때까지 요청을 모음
+# - 모은 배치는 추론 전용 스레드에서 한 번의 predict_departments 호출로 처리
+# - 추론 중에 쌓인 요청은 다음 배치로 바로 묶이므로 부하가 높을수록 배치가 커짐
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=10):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def submit(self, text, top_k):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, top_k, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _, _ in batch]
+            top_k = max(k for _, k, _ in batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_fn, texts, top_k)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, k, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result[:k])
+
+
+class PredictionServer:
+    def __init__(self, model_dir, max_batch_size, max_wait_ms, default_top_k=3, backend="torch",
+                 cache=None):
+        self.model_dir = model_dir
+        self.backend = backend
+        self.default_top_k = default_top_k
+        self.cache = cache
+        self.batcher = MicroBatcher(self._predict, max_batch_size, max_wait_ms)
+        self.ready = False
+
+    def _predict(self, texts, top_k):
+        predict = self.cache.predict_departments if self.cache else predict_specialty.predict_departments
+        return predict(texts, batch_size=self.batcher.max_batch_size, top_k=top_k)
+
+    async def load(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.batcher.executor, predict_specialty.load_model, self.model_dir, self.backend
+        )
+        self.ready = True
+        print(f"✅ 모델 로딩 완료: {self.model_dir} ({self.backend})")
+
+    # 🔸 라우팅
+    async def route(self, method, path, body):
+        if path == "/healthz":
+            return 200, {"status": "ok"}
+        if path == "/readyz":
+            if self.ready:
+                return 200, {"status": "ready"}
+            return 503, {"status": "loading"}
+        if path == "/stats":
+            return 200, {"cache": self.cache.stats() if self.cache else None}
+        if path != "/predict":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+        if not self.ready:
+            return 503, {"error": "model is loading"}
+
+        try:
+            payload = json.loads(body)
+            top_k = int(payload.get("top_k", self.default_top_k))
+            if "texts" in payload:
+                if not isinstance(payload["texts"], list) or not all(isinstance(t, str) for t in payload["texts"]):
+                    return 400, {"error": "'texts' must be a list of strings"}
+                texts = payload["texts"]
+            else:
+                if not isinstance(payload["text"], str):
+                    return 400, {"error": "'text' must be a string"}
+                texts = [payload["text"]]
+        except (ValueError, KeyError, TypeError, AttributeError, OverflowError):  # OverflowError: top_k=1e400
+            return 400, {"error": "body must be JSON with 'text' or 'texts'"}
+        if top_k < 1:
+            return 400, {"error": "top_k must be >= 1"}
+
+        try:
+            results = await asyncio.gather(*(self.batcher.submit(t, top_k) for t in texts))
+        except Exception as e:
+            print(f"❌ 예측 오류: {e}")
+            return 500, {"error": "prediction failed"}
+
+        predictions = [
+            [{"department": label, "probability": prob} for label, prob in result]
+            for result in results
+        ]
+        if "texts" in payload:
+            return 200, {"predictions": predictions}
+        return 200, {"prediction": predictions[0]}
+
+    # 🔸 HTTP/1.1 연결 처리 (keep-alive 지원)
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "bad content-length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                path = target.split("?", 1)[0]
+                status, payload = await self.route(method.upper(), path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(args):
+    cache = None
+    if args.cache_size > 0:
+        cache = PredictionCache(args.cache_size, args.cache_db, namespace=f"{args.model_dir}:{args.backend}")
+    server = PredictionServer(
+        args.model_dir, args.max_batch_size, args.max_wait_ms, args.top_k, args.backend, cache
+    )
+    batcher_task = asyncio.create_task(server.batcher.run())
+    loader_task = asyncio.create_task(server.load())
+
+    http = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"🚀 서버 시작: http://{args.host}:{args.port} (배치 {args.max_batch_size}, 대기 {args.max_wait_ms}ms)")
+    async with http:
+        serve_task = asyncio.create_task(http.serve_forever())
+        try:
+            # 🔸 로딩 중에도 /healthz, /readyz는 응답하고, 로딩이 실패하면 서버를 내리고 종료
+            try:
+                await loader_task
+            except Exception as e:
+                raise SystemExit(f"❌ 모델 로딩 실패: {args.model_dir} ({args.backend}): {e}")
+            await serve_task
+        finally:
+            serve_task.cancel()
+            batcher_task.cancel()
+            loader_task.cancel()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KM-BERT 진료과 예측 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-dir", default=predict_specialty.MODEL_DIR)
+    parser.add_argument("--backend", choices=predict_specialty.BACKENDS, default=predict_specialty.BACKEND)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--cache-size", type=int, default=10000, help="예측 캐시 최대 개수 (0이면 사용 안 함)")
+    parser.add_argument("--cache-db", default=None, help="재시작 후에도 유지할 SQLite 캐시 파일 경로")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(),
+                        help="torch intra-op 스레드 수 (기본: 전체 CPU 코어)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    torch.set_num_threads(args.threads)
+    asyncio.run(serve(args))
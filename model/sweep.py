@@ -0,0 +1,196 @@
+# 하이퍼파라미터 탐색 (learning_rate × max_length × batch_size × epochs)
+# - 조합(trial)마다 별도 프로세스에서 학습, 동시에 --workers개 실행
+# - CPU 스레드를 trial 간에 나눠 배정 (기본: cpu_count // workers) → 서로 코어를 두고 경쟁하지 않음
+# - 1 에포크 평가 후 macro-F1(또는 top-3 정확도)이 지금까지의 최고 trial보다 --prune-margin 이상 낮으면 중단
+# - 모든 trial 결과를 하나의 표(CSV)로 저장
+#
+# 실행 (저장소 루트에서):
+#   python -m model.sweep --learning-rates 1e-5,2e-5,5e-5 --max-lengths 128,256 \
+#       --batch-sizes 16,32 --epochs 3 --workers 4 --padding dynamic
+
+import argparse
+import csv
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import product
+from multiprocessing import Manager, get_context
+
+from transformers import TrainerCallback
+
+from model.cli_args import float_list, int_list
+
+SWEEP_DIR = "./sweeps"
+PRUNE_METRICS = ("f1_macro", "top3_accuracy")
+COLUMNS = [
+    "trial", "learning_rate", "max_length", "batch_size", "epochs", "status", "epochs_run",
+    "accuracy", "f1_macro", "top3_accuracy", "epoch1_score", "train_seconds", "threads",
+]
+
+
+# ✅ 1 에포크 평가 점수를 다른 trial과 비교해 뒤처지면 학습 중단
+# - shared_scores: Manager dict {trial: 1 에포크 점수} (프로세스 간 공유)
+class EpochOnePruner(TrainerCallback):
+    def __init__(self, trial, shared_scores, metric="f1_macro", margin=0.02):
+        self.trial = trial
+        self.shared_scores = shared_scores
+        self.metric = metric
+        self.margin = margin
+        self.epoch1_score = None
+        self.pruned = False
+
+    def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+        if self.epoch1_score is not None or not metrics:
+            return
+        self.epoch1_score = metrics[f"eval_{self.metric}"]
+        others = [score for trial, score in self.shared_scores.items() if trial != self.trial]
+        self.shared_scores[self.trial] = self.epoch1_score
+        if others and self.epoch1_score < max(others) - self.margin:
+            self.pruned = True
+            control.should_training_stop = True
+            print(f"✂️ trial {self.trial} 중단: 1 에포크 {self.metric} {self.epoch1_score:.4f} "
+                  f"< 최고 {max(others):.4f} - {self.margin}")
+
+
+# ✅ trial 하나 실행 (작업 프로세스)
+def run_trial(trial, config, options, shared_scores):
+    import torch
+
+    torch.set_num_threads(options["threads"])
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    from transformers import AutoTokenizer
+
+    from model import learning_model as lm
+
+    row = {"trial": trial, **config, "threads": options["threads"], "epochs_run": 0}
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(lm.MODEL_NAME)
+        train_dataset, test_dataset, data_info = lm.load_datasets(
+            tokenizer, options["train_dir"], options["test_dir"], config["max_length"], options["padding"]
+        )
+        pruner = EpochOnePruner(trial, shared_scores, options["prune_metric"], options["prune_margin"])
+        training_args = lm.build_training_args(
+            config["batch_size"], config["epochs"], config["learning_rate"],
+            output_dir=os.path.join(options["output_dir"], f"trial-{trial:03d}"),
+            save_strategy="no",
+            disable_tqdm=True,
+            dataloader_num_workers=0,
+        )
+        trainer = lm.build_trainer(
+            lm.load_model(data_info["label_classes"]), tokenizer, train_dataset, test_dataset,
+            training_args, padding=options["padding"], callbacks=[pruner],
+        )
+
+        start = time.perf_counter()
+        trainer.train()
+        row["train_seconds"] = round(time.perf_counter() - start, 1)
+
+        # 🔸 마지막 평가 결과 (중단된 trial은 1 에포크 결과)
+        metrics = [log for log in trainer.state.log_history if "eval_f1_macro" in log][-1]
+        row.update({
+            "status": "pruned" if pruner.pruned else "completed",
+            "epochs_run": round(metrics.get("epoch", 0)),
+            "accuracy": metrics["eval_accuracy"],
+            "f1_macro": metrics["eval_f1_macro"],
+            "top3_accuracy": metrics["eval_top3_accuracy"],
+            "epoch1_score": pruner.epoch1_score,
+        })
+    except Exception:
+        traceback.print_exc()
+        row["status"] = "failed"
+    return row
+
+
+def write_table(rows, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_table(rows, metric):
+    print(f"\n{'trial':>5} {'lr':>8} {'max_len':>7} {'batch':>5} {'epochs':>6} {'status':>9} "
+          f"{'acc':>6} {'f1':>6} {'top3':>6} {'sec':>7}")
+    for r in sorted(rows, key=lambda r: -(r.get(metric) or 0)):
+        def fmt(key):
+            return f"{r[key]:.4f}" if r.get(key) is not None else "-"
+        print(f"{r['trial']:>5} {r['learning_rate']:>8.0e} {r['max_length']:>7} {r['batch_size']:>5} "
+              f"{r['epochs_run']:>2}/{r['epochs']:<3} {r['status']:>9} {fmt('accuracy'):>6} "
+              f"{fmt('f1_macro'):>6} {fmt('top3_accuracy'):>6} {r.get('train_seconds', '-'):>7}")
+
+
+def parse_args():
+    from model import learning_model as lm
+
+    parser = argparse.ArgumentParser(description="KM-BERT 하이퍼파라미터 탐색")
+    parser.add_argument("--train-dir", default=lm.TRAIN_DIR)
+    parser.add_argument("--test-dir", default=lm.TEST_DIR)
+    parser.add_argument("--learning-rates", type=float_list, default=[1e-5, 2e-5, 5e-5])
+    parser.add_argument("--max-lengths", type=int_list, default=[lm.MAX_LENGTH])
+    parser.add_argument("--batch-sizes", type=int_list, default=[lm.BATCH_SIZE])
+    parser.add_argument("--epochs", type=int_list, default=[lm.EPOCHS])
+    parser.add_argument("--padding", choices=lm.PADDING_MODES, default="max_length")
+    parser.add_argument("--workers", type=int, default=2, help="동시에 실행할 trial 수")
+    parser.add_argument("--threads", type=int, default=None, help="trial당 torch 스레드 수 (기본: cpu_count // workers)")
+    parser.add_argument("--prune-metric", choices=PRUNE_METRICS, default="f1_macro")
+    parser.add_argument("--prune-margin", type=float, default=0.02,
+                        help="1 에포크 점수가 최고 trial보다 이만큼 이상 낮으면 중단")
+    parser.add_argument("--output-dir", default=None, help=f"trial 출력 / 결과 표 폴더 (기본: {SWEEP_DIR}/<시각>)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    from transformers import AutoTokenizer
+
+    from model import learning_model as lm
+
+    output_dir = args.output_dir or os.path.join(SWEEP_DIR, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(output_dir, exist_ok=True)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    # 🔸 토크나이징 캐시를 미리 만들어 두어 작업 프로세스들이 동시에 같은 캐시를 만들지 않도록 함
+    tokenizer = AutoTokenizer.from_pretrained(lm.MODEL_NAME)
+    for max_length in args.max_lengths:
+        lm.load_datasets(tokenizer, args.train_dir, args.test_dir, max_length, args.padding)
+
+    configs = [
+        {"learning_rate": lr, "max_length": max_length, "batch_size": batch_size, "epochs": epochs}
+        for lr, max_length, batch_size, epochs in product(
+            args.learning_rates, args.max_lengths, args.batch_sizes, args.epochs
+        )
+    ]
+    options = {
+        "train_dir": args.train_dir,
+        "test_dir": args.test_dir,
+        "padding": args.padding,
+        "threads": threads,
+        "prune_metric": args.prune_metric,
+        "prune_margin": args.prune_margin,
+        "output_dir": output_dir,
+    }
+    print(f"🔍 trial {len(configs)}개, 동시 실행 {args.workers}개, trial당 스레드 {threads}개")
+
+    rows = []
+    with Manager() as manager:
+        shared_scores = manager.dict()
+        with ProcessPoolExecutor(args.workers, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(run_trial, trial, config, options, shared_scores)
+                       for trial, config in enumerate(configs)]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                print(f"✅ trial {row['trial']} {row['status']}: f1_macro={row.get('f1_macro')}")
+
+    rows.sort(key=lambda r: r["trial"])
+    table_path = os.path.join(output_dir, "results.csv")
+    write_table(rows, table_path)
+    print_table(rows, args.prune_metric)
+    print(f"\n✅ 결과 표 저장: {table_path}")
@@ -0,0 +1,133 @@
+# 토크나이징된 학습/평가 데이터셋 디스크 캐시
+# - 캐시 키: 원본 JSON 파일 내용 해시 + 토크나이저 이름 + max_length / truncation / padding 설정
+# - 캐시가 있으면 Arrow 파일을 메모리 매핑으로 불러오므로 JSON 파싱과 토크나이징을 모두 건너뜀
+# - 캐시가 없으면 load_dataset(스트리밍) → 라벨 인코딩 → Dataset.map(tokenize) 후 저장
+
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+CACHE_DIR = "./.cache/tokenized"
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+
+
+# ✅ 데이터 폴더의 JSON 파일 내용 해시 (파일 이름 순서 고정)
+# - 샤드 저장소(corpus.store)는 manifest의 샤드 해시로 계산
+def source_fingerprint(data_dir):
+    from corpus.store import CorpusStore, is_store
+
+    if is_store(data_dir):
+        return CorpusStore(data_dir).fingerprint()
+    digest = hashlib.sha256()
+    for fname in sorted(os.listdir(data_dir)):
+        if not fname.endswith(".json"):
+            continue
+        digest.update(fname.encode("utf-8") + b"\0")
+        with open(os.path.join(data_dir, fname), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# ✅ 캐시 폴더 원자적 저장 (토크나이징 캐시 / model.feature_cache 공용)
+# - with 블록 안에서 임시 폴더(path.tmp)에 캐시 파일을 쓰고, 끝나면 기존 캐시를 지우고 이름을 바꿈
+# - 중간에 예외가 나면 임시 폴더를 지움 → 깨진 캐시가 path에 남지 않음
+@contextmanager
+def atomic_cache_dir(path):
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        yield tmp_path
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def write_meta(cache_path, meta):
+    with open(os.path.join(cache_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def cache_key(train_dir, test_dir, tokenizer_name, max_length, padding="max_length", truncation=True):
+    spec = {
+        "version": CACHE_VERSION,
+        "train": source_fingerprint(train_dir),
+        "test": source_fingerprint(test_dir),
+        "tokenizer": tokenizer_name,
+        "max_length": max_length,
+        "padding": padding,
+        "truncation": truncation,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+
+
+def _build(train_dir, test_dir, tokenizer, max_length, padding, truncation):
+    from collections import Counter
+
+    from datasets import DatasetDict
+
+    from corpus.loader import load_dataset
+
+    # ✅ 1~2. 데이터 불러오기 (문서를 하나씩 읽어 Arrow 파일로 기록 → 말뭉치 전체를 메모리에 올리지 않음)
+    dataset_dict = DatasetDict({"train": load_dataset(train_dir), "test": load_dataset(test_dir)})
+
+    # ✅ 3. 라벨 인코딩 (LabelEncoder와 같은 정렬 순서)
+    # 🔸 라벨 열 전체를 리스트로 만들지 않고 배치 단위로 세기
+    label_counts = Counter()
+    for batch in dataset_dict["train"].select_columns(["label"]).iter(batch_size=10000):
+        label_counts.update(batch["label"])
+    label_classes = sorted(label_counts)
+    unseen = set(dataset_dict["test"].unique("label")) - set(label_classes)
+    if unseen:
+        raise ValueError(f"평가 데이터에 학습 데이터에 없는 라벨이 있습니다: {sorted(unseen)}")
+    label2id = {label: i for i, label in enumerate(label_classes)}
+
+    # ✅ 4. Dataset 변환 및 토크나이징
+    def tokenize(example):
+        kwargs = {"truncation": truncation, "max_length": max_length}
+        if padding:
+            kwargs["padding"] = padding
+        encoded = tokenizer(example["text"], **kwargs)
+        encoded["labels"] = [label2id[label] for label in example["label"]]
+        return encoded
+
+    dataset_dict = dataset_dict.map(tokenize, batched=True, remove_columns=["label"])
+
+    meta = {
+        "label_classes": label_classes,
+        "train_size": len(dataset_dict["train"]),
+        "test_size": len(dataset_dict["test"]),
+        "label_counts": {label: n for label, n in label_counts.most_common()},
+    }
+    return dataset_dict, meta
+
+
+# ✅ 캐시에서 불러오거나 새로 만들어 저장
+# - 반환: (train_dataset, test_dataset, meta) / meta에는 label_classes, train_size, label_counts 포함
+def load_tokenized_datasets(train_dir, test_dir, tokenizer, tokenizer_name, max_length,
+                            padding="max_length", truncation=True, cache_dir=CACHE_DIR):
+    from datasets import DatasetDict
+
+    key = cache_key(train_dir, test_dir, tokenizer_name, max_length, padding, truncation)
+    path = os.path.join(cache_dir, key)
+
+    if os.path.exists(os.path.join(path, META_FILE)):
+        dataset_dict = DatasetDict.load_from_disk(path)  # Arrow 파일 메모리 매핑
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        print(f"✅ 토크나이징 캐시 사용: {path}")
+    else:
+        dataset_dict, meta = _build(train_dir, test_dir, tokenizer, max_length, padding, truncation)
+        with atomic_cache_dir(path) as tmp_path:
+            dataset_dict.save_to_disk(tmp_path)
+            write_meta(tmp_path, meta)
+        dataset_dict = DatasetDict.load_from_disk(path)
+        print(f"✅ 토크나이징 캐시 저장: {path}")
+
+    return dataset_dict["train"], dataset_dict["test"], meta
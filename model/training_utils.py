@@ -0,0 +1,223 @@
+# 학습 보조 도구
+# - SamplerTrainer: 학습 샘플러를 바꿔 끼울 수 있는 Trainer (길이 그룹 배치 등)
+# - 패딩 비율 계산: 고정 길이 패딩 / 배치별 동적 패딩(무작위 순서) / 동적 패딩 + 길이 그룹 배치
+# - EpochTimer: 에포크별 소요 시간 기록
+# - SkipFinalEvaluation: 마지막 에포크의 평가를 건너뜀 (학습 후 predict 한 번으로 최종 지표 계산)
+# - time_training_steps: 배치 구성 방식별 학습 step 시간 측정 (에포크 속도 비교용)
+# - ClassBalancedSampler: 진료과별 상한 / 가중치 + 에포크당 샘플 수 제한
+# - CPU 학습 설정: bf16 지원 확인 / intra·inter-op 스레드 설정 / ThroughputMeter(초당 학습 샘플 수)
+
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+from transformers import Trainer, TrainerCallback
+from transformers.trainer_pt_utils import LengthGroupedSampler
+
+
+# ✅ 학습 샘플러를 외부에서 지정할 수 있는 Trainer
+# - train_sampler_fn(trainer) → torch Sampler, None이면 Trainer 기본 샘플러(무작위 순서) 사용
+# - 샘플러는 에포크마다 다시 순회되므로 매 에포크 새로운 순서로 섞임
+class SamplerTrainer(Trainer):
+    def __init__(self, *args, train_sampler_fn=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.train_sampler_fn = train_sampler_fn
+
+    def _get_train_sampler(self, *args, **kwargs):
+        if self.train_sampler_fn is None:
+            return super()._get_train_sampler(*args, **kwargs)
+        return self.train_sampler_fn(self)
+
+
+# ✅ 길이가 비슷한 예제끼리 배치로 묶는 샘플러 (무작위 메가배치 안에서 길이순 정렬)
+def length_grouped_sampler(lengths, batch_size, generator=None):
+    return LengthGroupedSampler(batch_size, lengths=list(lengths), generator=generator)
+
+
+def index_batches(indices, batch_size):
+    indices = list(indices)
+    return [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+
+
+# ✅ 배치 목록의 패딩 비율 (pad_to가 주어지면 모든 배치를 그 길이로 패딩한 것으로 계산)
+def padding_fraction(lengths, batches, pad_to=None):
+    lengths = np.asarray(lengths)
+    real = padded = 0
+    for batch in batches:
+        batch_lengths = lengths[batch]
+        real += int(batch_lengths.sum())
+        padded += (pad_to or int(batch_lengths.max())) * len(batch)
+    return 1 - real / padded if padded else 0.0
+
+
+def padding_report(lengths, batch_size, max_length, seed=42):
+    generator = torch.Generator().manual_seed(seed)
+    random_batches = index_batches(torch.randperm(len(lengths), generator=generator).tolist(), batch_size)
+    grouped_batches = index_batches(length_grouped_sampler(lengths, batch_size, generator), batch_size)
+    return {
+        "max_length": padding_fraction(lengths, random_batches, pad_to=max_length),
+        "dynamic": padding_fraction(lengths, random_batches),
+        "dynamic_grouped": padding_fraction(lengths, grouped_batches),
+    }
+
+
+CLASS_WEIGHTINGS = ("inverse", "sqrt")
+
+
+# ✅ 진료과 균형 샘플러 (에포크마다 새로 뽑음)
+# - cap: 진료과마다 에포크당 최대 cap건 (큰 진료과는 매 에포크 다른 부분집합을 사용)
+# - weighting: "inverse"(진료과 크기에 반비례) / "sqrt"(크기의 제곱근에 반비례) 확률로 budget건 복원 추출
+#   (cap도 주어지면 cap 적용 후의 진료과별 샘플에서 가중 추출)
+# - budget: 에포크당 샘플 수 (weighting이 없으면 cap 적용 후 무작위로 budget건만 사용)
+# - lengths / group_size가 주어지면 뽑힌 샘플 안에서 길이가 비슷한 것끼리 배치로 묶음 (dynamic 패딩)
+class ClassBalancedSampler(Sampler):
+    def __init__(self, labels, cap=None, weighting=None, budget=None, lengths=None, group_size=None, seed=42):
+        if weighting not in (None, *CLASS_WEIGHTINGS):
+            raise ValueError(f"지원하지 않는 가중치 방식: {weighting} (가능: {', '.join(CLASS_WEIGHTINGS)})")
+        self.labels = np.asarray(labels)
+        self.cap = cap
+        self.weighting = weighting
+        self.lengths = None if lengths is None else np.asarray(lengths)
+        self.group_size = group_size
+        self.seed = seed
+        self.epoch = 0
+        self.by_class = [np.flatnonzero(self.labels == c) for c in np.unique(self.labels)]
+
+        capped = sum(min(len(idx), cap) if cap else len(idx) for idx in self.by_class)
+        if weighting:
+            self.num_samples = budget or capped
+        else:
+            self.num_samples = min(budget, capped) if budget else capped
+
+    def __len__(self):
+        return self.num_samples
+
+    def sample_indices(self, rng):
+        by_class = [
+            rng.choice(idx, self.cap, replace=False) if self.cap and len(idx) > self.cap else idx
+            for idx in self.by_class
+        ]
+        pool = np.concatenate(by_class)
+        if self.weighting:
+            power = 1.0 if self.weighting == "inverse" else 0.5
+            probs = np.concatenate([np.full(len(idx), 1.0 / len(idx) ** power) for idx in by_class])
+            return rng.choice(pool, self.num_samples, replace=True, p=probs / probs.sum())
+        return rng.choice(pool, self.num_samples, replace=False)
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        indices = self.sample_indices(rng)
+        if self.lengths is not None and self.group_size:
+            generator = torch.Generator().manual_seed(self.seed + self.epoch)
+            order = length_grouped_sampler(self.lengths[indices], self.group_size, generator)
+            indices = indices[list(order)]
+        return iter(indices.tolist())
+
+
+# ✅ 라벨별 개수 (indices를 주면 해당 샘플만)
+def class_distribution(labels, indices=None):
+    labels = np.asarray(labels)
+    if indices is not None:
+        labels = labels[np.asarray(indices)]
+    values, counts = np.unique(labels, return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+class EpochTimer(TrainerCallback):
+    def __init__(self):
+        self.epoch_seconds = []
+        self._start = None
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        if self._start is not None:
+            self.epoch_seconds.append(time.perf_counter() - self._start)
+            print(f"⏱️ 에포크 {len(self.epoch_seconds)} 소요 시간: {self.epoch_seconds[-1]:.1f}s")
+
+
+# ✅ 마지막 에포크 평가 생략
+# - 에포크마다 평가(eval_strategy="epoch")하더라도 마지막 에포크는 학습 후 trainer.predict 결과로 대신하므로
+#   테스트 데이터 추론이 두 번 실행되지 않도록 함 (DefaultFlowCallback 뒤에 실행되어 평가 플래그를 끔)
+class SkipFinalEvaluation(TrainerCallback):
+    def on_epoch_end(self, args, state, control, **kwargs):
+        if state.global_step >= state.max_steps:
+            control.should_evaluate = False
+
+
+# ✅ 에포크별 소요 시간 / 평가 macro-F1 요약 출력
+# - final_f1: 마지막 에포크 평가를 생략한 경우 최종 predict의 macro-F1
+def print_epoch_summary(epoch_seconds, log_history, samples_per_epoch, final_f1=None):
+    f1_by_epoch = {round(log["epoch"]): log["eval_f1_macro"] for log in log_history if "eval_f1_macro" in log}
+    if final_f1 is not None and epoch_seconds:
+        f1_by_epoch[len(epoch_seconds)] = final_f1
+    print(f"\n{'epoch':>5} {'samples':>8} {'sec':>8} {'f1_macro':>9}")
+    for epoch, seconds in enumerate(epoch_seconds, 1):
+        f1 = f1_by_epoch.get(epoch)
+        f1 = "-" if f1 is None else f"{f1:.4f}"
+        print(f"{epoch:>5} {samples_per_epoch:>8} {seconds:>8.1f} {f1:>9}")
+
+
+# ✅ 배치 구성별 학습 step 평균 시간 (forward + backward, 옵티마이저 갱신 제외)
+# - 반환값 × 배치 수 = 에포크 소요 시간 추정치
+def time_training_steps(model, dataset, batches, collate_fn, steps=20, warmup=2):
+    model.train()
+    device = next(model.parameters()).device
+    times = []
+    for n, batch in enumerate(batches[:steps + warmup]):
+        inputs = collate_fn([dataset[i] for i in batch])
+        inputs = {key: val.to(device) for key, val in inputs.items()}
+        start = time.perf_counter()
+        model(**inputs).loss.backward()
+        model.zero_grad(set_to_none=True)
+        if n >= warmup:
+            times.append(time.perf_counter() - start)
+    return float(np.mean(times)) if times else 0.0
+
+
+# ✅ CPU가 bf16 연산을 지원하는지 (AVX512-BF16 / AMX)
+def cpu_supports_bf16():
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        pass
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        return False
+
+
+# ✅ torch CPU 스레드 수 설정
+# - intra-op: 연산 하나(행렬곱 등)를 나눠 처리하는 스레드 / inter-op: 서로 독립적인 연산을 동시에 실행하는 스레드
+# - inter-op 스레드 수는 병렬 연산이 한 번이라도 실행된 뒤에는 바꿀 수 없음 → 가능한 한 일찍 호출
+def configure_cpu_threads(threads=None, interop_threads=None):
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            print(f"⚠️ inter-op 스레드 수를 바꿀 수 없습니다 (현재 {torch.get_num_interop_threads()}개)")
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+# ✅ 학습 처리량 측정 (warmup step 이후 초당 샘플 수)
+# - torch.compile 컴파일 / 데이터 로더 워커 시작 시간은 warmup에 포함되어 제외됨
+class ThroughputMeter(TrainerCallback):
+    def __init__(self, warmup_steps=5):
+        self.warmup_steps = warmup_steps
+        self.samples_per_second = None
+        self._start = None
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if state.global_step == self.warmup_steps:
+            self._start = time.perf_counter()
+        elif self._start is not None and state.global_step > self.warmup_steps:
+            steps = state.global_step - self.warmup_steps
+            batch = args.per_device_train_batch_size * args.gradient_accumulation_steps * max(args.n_gpu, 1)
+            self.samples_per_second = steps * batch / (time.perf_counter() - self._start)
@@ -1,9 +1,23 @@
+# 모델 버전별 진료과 성능 비교 그림
+# - model.evaluation이 저장한 평가 결과 파일(eval_artifacts/<버전>.json) 여러 개를 읽어 진료과별 F1 / top-k 정확도 막대그래프 생성
+# - 화면 없이(Agg 백엔드) PNG로 저장하므로 서버 / CI에서도 실행 가능
+#
+# 실행 (저장소 루트에서):
+#   python -m model.visualize_result eval_artifacts/v1.json eval_artifacts/v2.json --output compare.png
+#   python -m model.visualize_result eval_artifacts/v2.json --confusion
+
+import argparse
+import os
+import platform
+
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.font_manager as fm
+
+from model.evaluation import load_artifact
 
 # ✅ 한글 폰트 설정 (Windows: 맑은 고딕 / Mac: AppleGothic)
-import platform
 if platform.system() == 'Windows':
     plt.rc('font', family='Malgun Gothic')
 elif platform.system() == 'Darwin':
@@ -11,36 +25,86 @@ elif platform.system() == 'Darwin':
 else:
     plt.rc('font', family='DejaVu Sans')  # Ubuntu or fallback
 
-# ✅ 예시 데이터
-departments = [
-    '산부인과', '치과', '정형외과', '안과', '영상의학과', '비뇨의학과', '혈액종양내과', '흉부외과',
-    '순환기내과', '피부과', '정신건강의학과', '마취통증의학과', '류마티스내과', '신장내과', '소아청소년과', '신경외과', '성형외과',
-    '응급의학과', '호흡기내과', '이비인후과', '소화기내과', '재활의학과', '신경과', '외과', '감염내과', '내분비대사내과', '가정의학과', '내과']
-
-v1_f1 = [0.86, 0.93, 0.47, 0.92, 0.68, 0.81, 0.60, 0.57, 0.60, 0.79, 0.78, 0.57, 0.82, 0.72, 0.65, 0.45, 0.85, 0.38, 0.72, 0.72, 0.69, 0.54, 0.54, 0.44, 0.44, 0.53, 0.06, 0]
-v2_f1 = [0.85, 0, 0.52, 0.92, 0.59, 0.86, 0, 0.56, 0, 0.67, 0.70, 0.52, 0, 0, 0.27, 0.45, 0.89, 0.11, 0, 0.72, 0, 0.42, 0.47, 0.48, 0, 0, 0.08, 0.63]
-v1_top3 = [0.97, 0.97, 0.95, 0.95, 0.94, 0.93, 0.91, 0.90, 0.89, 0.88, 0.87, 0.86, 0.84, 0.80, 0.77, 0.75, 0.73, 0.69, 0.69, 0.61, 0.52, 0.49, 0.42, 0.27, 0.17, 0.06, 0.01, 0]
-v2_top3 = [0.95, 0, 0.90, 0.98, 1, 0.97, 0, 0.58, 0, 0.91, 0.95, 0.86, 0, 0, 0.77, 0.80, 0.96, 0.31, 0, 0.87, 0, 0.66, 0.77, 0.73, 0, 0, 0.37, 0.89]
-
-# ✅ x 좌표 및 막대 폭 설정
-x = np.arange(len(departments))
-width = 0.2
-
-# ✅ 그래프 그리기
-fig, ax = plt.subplots(figsize=(20, 6))
-ax.bar(x - 1.5*width, v1_f1, width, label='v1 f1-score')
-ax.bar(x - 0.5*width, v2_f1, width, label='v2 f1-score')
-ax.bar(x + 0.5*width, v1_top3, width, label='v1 top3_acc')
-ax.bar(x + 1.5*width, v2_top3, width, label='v2 top3_acc')
-
-# ✅ 라벨 및 범례 설정
-ax.set_ylabel('Score')
-ax.set_title('진료과별 성능 비교')
-ax.set_xticks(x)
-ax.set_xticklabels(departments, rotation=45, ha='right')
-ax.legend(loc='upper right')
-ax.set_ylim(0, 1.0)
-
-plt.tight_layout()
-plt.grid(axis='y', linestyle='--', alpha=0.5)
-plt.show()
+
+# ✅ 진료과별 성능 비교 막대그래프
+# - 진료과 순서: 첫 번째 버전의 top-k 정확도 내림차순 / 어떤 버전에 없는 진료과는 0으로 표시
+def plot_comparison(artifacts, output, top_k=3):
+    metric = f"top{top_k}_accuracy"
+    first = artifacts[0]["per_class"]
+    departments = sorted(first, key=lambda d: -first[d].get(metric, 0))
+    for artifact in artifacts[1:]:
+        departments += [d for d in artifact["per_class"] if d not in departments]
+
+    series = []
+    for artifact in artifacts:
+        per_class = artifact["per_class"]
+        version = artifact["model_version"]
+        series.append((f"{version} f1-score", [per_class.get(d, {}).get("f1", 0) for d in departments]))
+    for artifact in artifacts:
+        per_class = artifact["per_class"]
+        version = artifact["model_version"]
+        series.append((f"{version} top{top_k}_acc", [per_class.get(d, {}).get(metric, 0) for d in departments]))
+
+    # ✅ x 좌표 및 막대 폭 설정
+    x = np.arange(len(departments))
+    width = 0.8 / len(series)
+
+    # ✅ 그래프 그리기
+    fig, ax = plt.subplots(figsize=(max(20, len(departments) * 0.25 * len(series)), 6))
+    for i, (name, values) in enumerate(series):
+        ax.bar(x + (i - (len(series) - 1) / 2) * width, values, width, label=name)
+
+    # ✅ 라벨 및 범례 설정
+    ax.set_ylabel('Score')
+    ax.set_title('진료과별 성능 비교')
+    ax.set_xticks(x)
+    ax.set_xticklabels(departments, rotation=45, ha='right')
+    ax.legend(loc='upper right')
+    ax.set_ylim(0, 1.0)
+
+    plt.tight_layout()
+    plt.grid(axis='y', linestyle='--', alpha=0.5)
+    fig.savefig(output, dpi=150)
+    plt.close(fig)
+    return output
+
+
+# ✅ 혼동 행렬 그림 (기본 경로: 평가 결과 파일과 같은 이름의 _confusion.png)
+def plot_confusion_matrix(artifact_path, output=None):
+    import seaborn as sns
+
+    artifact = load_artifact(artifact_path)
+    labels = artifact["labels"]
+    output = output or os.path.splitext(artifact_path)[0] + "_confusion.png"
+
+    fig = plt.figure(figsize=(12, 10))
+    sns.heatmap(np.array(artifact["confusion_matrix"]), annot=True, fmt="d",
+                xticklabels=labels, yticklabels=labels, cmap="Blues")
+    plt.xlabel("Predicted Label")
+    plt.ylabel("True Label")
+    plt.title(f"Confusion Matrix ({artifact['model_version']})")
+    plt.xticks(rotation=90)
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    fig.savefig(output, dpi=150)
+    plt.close(fig)
+    return output
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="모델 버전별 진료과 성능 비교 그림")
+    parser.add_argument("artifacts", nargs="+", help="평가 결과 파일(JSON) 목록 (그래프 순서)")
+    parser.add_argument("--output", default="compare_result.png")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--confusion", action="store_true", help="버전마다 혼동 행렬 그림도 저장")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    artifacts = [load_artifact(path) for path in args.artifacts]
+    print(f"✅ 비교 그림 저장: {plot_comparison(artifacts, args.output, args.top_k)}")
+
+    if args.confusion:
+        for path in args.artifacts:
+            print(f"✅ Confusion Matrix 저장: {plot_confusion_matrix(path)}")